@@ -10,11 +10,13 @@ from src.Helpers.Response import apiResponse
 from src.Modules.Candidate.CandidateService import CandidateService
 from src.Modules.Interviews.InterviewServices import InterviewSchedulerService
 from src.Modules.Jobs.JobService import JobService
+from src.Modules.LLMUsage.LLMUsageService import LLMUsageService
 
 ADMIN_CONTROLLER = Blueprint('admin_controller', __name__, url_prefix='/api/v1/admin')
 jobService = JobService()
 interviewService = InterviewSchedulerService()
 candidateService = CandidateService()
+llmUsageService = LLMUsageService()
 
 
 #====================================
@@ -159,6 +161,58 @@ def complete_interview(schedule_id: str):
     )
 
 
+#====================================
+# LLM Usage Endpoints
+#====================================
+
+@ADMIN_CONTROLLER.route('/llm-usage/stages', methods=['GET'])
+@jwt_required()
+def get_llm_usage_by_stage():
+    """Tokens, latency, retries and cost per pipeline stage, optionally over the last `days` days"""
+    usage = llmUsageService.get_usage_by_stage(request.args.get('days', type=int))
+    return apiResponse(False, 200, usage, "LLM usage by stage fetched successfully")
+
+
+@ADMIN_CONTROLLER.route('/llm-usage/tasks', methods=['GET'])
+@jwt_required()
+def get_llm_usage_by_task():
+    """Tokens, latency, retries and cost per LLM task"""
+    usage = llmUsageService.get_usage_by_task(request.args.get('days', type=int))
+    return apiResponse(False, 200, usage, "LLM usage by task fetched successfully")
+
+
+@ADMIN_CONTROLLER.route('/llm-usage/models', methods=['GET'])
+@jwt_required()
+def get_llm_usage_by_task_and_model():
+    """Tokens, latency, retries and cost per task and routed model"""
+    usage = llmUsageService.get_usage_by_task_and_model(request.args.get('days', type=int))
+    return apiResponse(False, 200, usage, "LLM usage by task and model fetched successfully")
+
+
+@ADMIN_CONTROLLER.route('/llm-usage/jobs', methods=['GET'])
+@jwt_required()
+def get_llm_usage_by_job():
+    """Tokens, latency, retries and cost per job"""
+    usage = llmUsageService.get_usage_by_job(request.args.get('days', type=int))
+    return apiResponse(False, 200, usage, "LLM usage by job fetched successfully")
+
+
+@ADMIN_CONTROLLER.route('/llm-usage/daily', methods=['GET'])
+@jwt_required()
+def get_llm_usage_by_day():
+    """Tokens, latency, retries and cost per day, 30 days by default"""
+    usage = llmUsageService.get_usage_by_day(request.args.get('days', 30, type=int))
+    return apiResponse(False, 200, usage, "Daily LLM usage fetched successfully")
+
+
+@ADMIN_CONTROLLER.route('/llm-usage/candidates/<string:candidate_id>', methods=['GET'])
+@jwt_required()
+def get_llm_usage_for_candidate(candidate_id: str):
+    """Every LLM call made for a candidate, with totals"""
+    usage = llmUsageService.get_usage_for_candidate(candidate_id)
+    return apiResponse(False, 200, usage, "Candidate LLM usage fetched successfully")
+
+
 # ====================================
 # Candidate Monitoring Endpoints
 # ====================================
@@ -3,6 +3,10 @@ from datetime import datetime, timezone
 import json
 import time
 
+from src.Helpers.CacheStats import all_cache_stats
+from src.Helpers.RetryPolicy import retry_stats
+from src.PipeLines.Profiling.DataScraping.GitHubScrap.GitHubTokenPool import token_pool_snapshot
+
 MONITOR_CONTROLLER = Blueprint('monitor', __name__)
 
 
@@ -95,4 +99,31 @@ def get_pipeline_status():
         return jsonify({
             "error": "Status check failed",
             "message": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@MONITOR_CONTROLLER.route('/api/monitor/llm/retries', methods=['GET'])
+def get_llm_retry_stats():
+    """Get LLM retry and give-up counters by cause"""
+    return jsonify({
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "retries": retry_stats.snapshot()
+    })
+
+
+@MONITOR_CONTROLLER.route('/api/monitor/caches', methods=['GET'])
+def get_cache_stats():
+    """Get hit rates of caches and deduplication steps"""
+    return jsonify({
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "caches": all_cache_stats()
+    })
+
+
+@MONITOR_CONTROLLER.route('/api/monitor/github/tokens', methods=['GET'])
+def get_github_token_usage():
+    """Get requests made and rate limit left per GitHub token"""
+    return jsonify({
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "tokens": token_pool_snapshot()
+    })
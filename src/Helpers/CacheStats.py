@@ -0,0 +1,47 @@
+import threading
+from typing import Dict, Any
+
+
+class CacheStats:
+    """Thread-safe hit and miss counters for one cache or deduplication step"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self._hits += 1
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._misses += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_registry: Dict[str, CacheStats] = {}
+_registry_lock = threading.Lock()
+
+
+def cache_stats(name: str) -> CacheStats:
+    """Returns the process-wide counters registered under name, creating them on first use"""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = CacheStats(name)
+        return _registry[name]
+
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        stats = list(_registry.values())
+    return {s.name: s.snapshot() for s in stats}
@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+from typing import Dict, Any
+
+from src.Modules.Candidate.CandidateDTOs import CandidateDTO
+from src.Modules.Candidate.CandidateModels import Candidate
+from src.Modules.PipeLineData.TextExtractionData.TextExtractionService import TextExtractionDataService
+
+
+@dataclass
+class CandidateContext:
+    """
+    Candidate, resume and job data a pipeline stage needs for one candidate, loaded once when the stage
+    picks the candidate up and passed to every scraper and verifier instead of being re-read by each of them.
+    Holds plain DTO dicts only, so it can be shared with worker threads.
+    """
+    candidate_id: str
+    candidate: Dict[str, Any]
+    resume: Dict[str, Any]
+    job: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.candidate.get('firstName', '')} {self.candidate.get('lastName', '')}".strip()
+
+    @property
+    def personal_information(self) -> Dict[str, Any]:
+        return self.resume.get("personalInformation") or {}
+
+    @classmethod
+    def load(cls, candidate: Candidate) -> "CandidateContext":
+        # The job is summarised separately, the full nested job DTO would load all of its requirements
+        candidate_data = CandidateDTO(exclude=("job",)).dump(candidate)
+        job = candidate.job
+        return cls(
+            candidate_id=candidate.id,
+            candidate=candidate_data,
+            resume=TextExtractionDataService().get_resume_by_candidate_id(candidate.id),
+            job={
+                "id": job.id,
+                "title": job.title,
+                "location": job.location,
+                "department": job.department
+            } if job else {}
+        )
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Optional
+
+from src.Helpers.CacheStats import cache_stats
+
+
+class DiskTTLCache:
+    """
+    JSON values on disk, one file per key, expiring after ttl_seconds.
+    Survives restarts and is shared by every thread and process using the same folder.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, name: str):
+        self.path = os.path.abspath(path)
+        self.ttl_seconds = ttl_seconds
+        self.stats = cache_stats(name)
+        os.makedirs(self.path, exist_ok=True)
+
+    def __file_for(self, key: str) -> str:
+        return os.path.join(self.path, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        file_path = self.__file_for(key)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats.record_miss()
+            return None
+
+        if time.time() - entry.get("stored_at", 0) > self.ttl_seconds:
+            self.stats.record_miss()
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            return None
+
+        self.stats.record_hit()
+        return entry.get("value")
+
+    def put(self, key: str, value: Any) -> None:
+        # Write to a temporary file first so readers never see a partial entry
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "stored_at": time.time(), "value": value}, f)
+            os.replace(tmp_path, self.__file_for(key))
+        except OSError as e:
+            print(f"Failed to write cache entry for {key}: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.__file_for(key))
+        except OSError:
+            pass
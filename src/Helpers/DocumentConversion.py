@@ -0,0 +1,232 @@
+import atexit
+import multiprocessing
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Union
+
+from src.config.ConfigBase import Config
+
+# Formats the converter can rasterise, DOCX is converted to PDF first
+SUPPORTED_DOCUMENT_EXTENSIONS = ('.pdf', '.docx')
+
+
+"""
+*******************************************************************************************************************
+Worker side, runs in the conversion processes
+"""
+
+
+def _limit_worker_memory(memory_limit_mb: Optional[int]) -> None:
+    """Caps the address space of a conversion process so one oversized document cannot exhaust the host"""
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        # Not available on Windows, the separate process still isolates the work from the API process
+        print(f"Document conversion memory limit not applied: {e}")
+
+
+def _render_document_pages(file_path: str, output_dir: str, poppler_path: Optional[str],
+                           dpi: int, max_width: int) -> List[str]:
+    """
+    Converts a PDF or DOCX document to one PNG file per page in output_dir.
+    Returns the page file paths, so no image data crosses the process boundary.
+    """
+    import pdf2image
+    from PIL import Image
+
+    source = Path(file_path)
+    pdf_path = source
+
+    # If document is DOCX, convert to PDF first
+    if source.suffix.lower() == '.docx':
+        from docx2pdf import convert
+        pdf_path = Path(output_dir) / f"{source.stem}.pdf"
+        convert(str(source), str(pdf_path))
+
+    page_count = pdf2image.pdfinfo_from_path(str(pdf_path), poppler_path=poppler_path)["Pages"]
+
+    # Render one page at a time so only a single full-resolution page is held in memory
+    page_paths = []
+    for page_number in range(1, page_count + 1):
+        page = pdf2image.convert_from_path(
+            str(pdf_path),
+            dpi=dpi,
+            fmt="PNG",
+            first_page=page_number,
+            last_page=page_number,
+            poppler_path=poppler_path
+        )[0]
+
+        # Optimize image size if needed
+        if page.size[0] > max_width:
+            ratio = max_width / page.size[0]
+            page = page.resize((max_width, int(page.size[1] * ratio)), Image.Resampling.LANCZOS)
+
+        page_path = Path(output_dir) / f"page_{page_number:03d}.png"
+        page.save(page_path, format="PNG", optimize=True)
+        page.close()
+        page_paths.append(str(page_path))
+
+    return page_paths
+
+
+def _conversion_worker(connection, memory_limit_mb: Optional[int], render_args: tuple) -> None:
+    """Entry point of a conversion process, sends back (True, page paths) or (False, error message)"""
+    _limit_worker_memory(memory_limit_mb)
+    try:
+        connection.send((True, _render_document_pages(*render_args)))
+    except BaseException as e:
+        connection.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+
+"""
+*******************************************************************************************************************
+Caller side
+"""
+
+
+class DocumentConversionTimeout(Exception):
+    """Raised when converting a document takes longer than the per-job timeout"""
+    pass
+
+
+class RenderedDocument:
+    """PNG pages of a document in a private temporary folder, removed by cleanup()"""
+
+    def __init__(self, output_dir: str, page_paths: List[str]):
+        self.output_dir = output_dir
+        self.page_paths = page_paths
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def __enter__(self) -> "RenderedDocument":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.cleanup()
+
+
+class DocumentConverter:
+    """
+    Runs CPU-heavy document conversion (rasterisation, resizing, PNG encoding) in separate processes,
+    so it does not hold the GIL shared by the API and the pipeline threads.
+    Every document gets its own process, so a document that times out is killed without touching
+    the conversions of other callers. At most `workers` conversions run at once, further callers wait.
+    """
+
+    def __init__(self,
+                 workers: int = 2,
+                 timeout: float = 120.0,  # seconds, per document
+                 memory_limit_mb: Optional[int] = 1024,
+                 poppler_path: Optional[str] = None,
+                 dpi: int = 300,
+                 max_width: int = 2000):
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.poppler_path = poppler_path
+        self.dpi = dpi
+        self.max_width = max_width
+
+        # Spawned workers do not inherit the locks held by the web server and pipeline threads
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._processes_lock = threading.Lock()
+        self._processes = set()
+
+    @classmethod
+    def from_config(cls) -> "DocumentConverter":
+        llm_config = Config().getConfig().get("llm") or {}
+        settings: Dict[str, Any] = llm_config.get("document_conversion") or {}
+        return cls(
+            workers=settings.get("workers", 2),
+            timeout=settings.get("timeout", 120.0),
+            memory_limit_mb=settings.get("memory_limit_mb", 1024),
+            poppler_path=llm_config.get("poppler_path"),
+            dpi=settings.get("dpi", 300),
+            max_width=settings.get("max_width", 2000),
+        )
+
+    def __run(self, file_path: Union[str, Path], output_dir: str) -> List[str]:
+        """Renders the document in a new process, killing only that process if it overruns the timeout"""
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_conversion_worker,
+            args=(sender, self.memory_limit_mb,
+                  (str(file_path), output_dir, self.poppler_path, self.dpi, self.max_width)),
+            daemon=True
+        )
+        with self._processes_lock:
+            self._processes.add(process)
+        try:
+            process.start()
+            sender.close()  # the worker holds the only sending end, so its exit shows up as EOF
+            if not receiver.poll(self.timeout):
+                raise DocumentConversionTimeout(
+                    f"Converting {Path(file_path).name} took longer than {self.timeout}s"
+                )
+            try:
+                succeeded, result = receiver.recv()
+            except EOFError:
+                # Killed without reporting back, e.g. by the memory limit
+                raise RuntimeError(f"Conversion process for {Path(file_path).name} exited with code "
+                                   f"{process.exitcode}")
+            if not succeeded:
+                raise RuntimeError(f"Converting {Path(file_path).name} failed: {result}")
+            return result
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join(5)
+            receiver.close()
+            with self._processes_lock:
+                self._processes.discard(process)
+
+    def convert_to_images(self, file_path: Union[str, Path]) -> RenderedDocument:
+        """
+        Converts a PDF or DOCX document to PNG pages.
+        The caller owns the returned pages and must call cleanup() once they are sent.
+        """
+        if Path(file_path).suffix.lower() not in SUPPORTED_DOCUMENT_EXTENSIONS:
+            raise ValueError(f"Cannot convert {Path(file_path).name}, "
+                             f"supported formats are {', '.join(SUPPORTED_DOCUMENT_EXTENSIONS)}")
+
+        output_dir = tempfile.mkdtemp(prefix="resume_pages_")
+        try:
+            with self._slots:
+                page_paths = self.__run(file_path, output_dir)
+            return RenderedDocument(output_dir, page_paths)
+        except Exception:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+
+    def shutdown(self) -> None:
+        """Kills conversions still running at exit"""
+        with self._processes_lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+_converter: Optional[DocumentConverter] = None
+_converter_lock = threading.Lock()
+
+
+def get_document_converter() -> DocumentConverter:
+    """Process-wide converter, every LLMService instance shares the same concurrency limit"""
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            _converter = DocumentConverter.from_config()
+            atexit.register(_converter.shutdown)
+        return _converter
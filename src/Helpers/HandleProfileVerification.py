@@ -5,6 +5,7 @@ import json
 
 from lxml.etree import indent
 
+from src.Helpers.CandidateContext import CandidateContext
 from src.Helpers.LLMService import LLMService
 from src.Modules.Candidate.CandidateService import CandidateService
 from src.Modules.PipeLineData.TextExtractionData.TextExtractionService import TextExtractionDataService
@@ -108,19 +109,27 @@ class HandleProfileVerification:
         }}
         """
 
-    def verify_profile(self, scraped_data: dict, candidate_id: str, profile_type: str) -> dict:
+    def verify_profile(self, scraped_data: dict, candidate_id: str, profile_type: str,
+                       context: Optional[CandidateContext] = None) -> dict:
+        """
+        Asks the LLM whether the scraped profile belongs to the candidate
+        Pass the stage's CandidateContext to avoid re-reading the candidate and resume for every profile checked
+        """
         try:
-            candidate_data = self.candidate_service.fetch_by_id(candidate_id)
-            resume_data = self.textExtractionDataService.get_resume_by_candidate_id(candidate_id)
+            if context is not None:
+                candidate_data, resume_data = context.candidate, context.resume
+            else:
+                candidate_data = self.candidate_service.fetch_by_id(candidate_id)
+                resume_data = self.textExtractionDataService.get_resume_by_candidate_id(candidate_id)
 
             if profile_type.lower() == "linkedin":
-                context = self.__create_linkedin_verification_prompt(scraped_data, candidate_data, resume_data)
+                comparison = self.__create_linkedin_verification_prompt(scraped_data, candidate_data, resume_data)
             elif profile_type.lower() == "github":
-                context = self.__create_github_verification_prompt(scraped_data, candidate_data, resume_data)
+                comparison = self.__create_github_verification_prompt(scraped_data, candidate_data, resume_data)
             else:
                 raise ValueError(f"Invalid profile type: {profile_type}")
 
-            prompt = self.__create_verification_prompt(context)
+            prompt = self.__create_verification_prompt(comparison)
             json_res = self.llm_service.verify_profile(prompt)
             print("Verification response:", json.dumps(json_res, indent=2))
 
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Union, List, Optional
+
+from src.Helpers.LLMSchemas import to_gemini_schema
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0  # part of input_tokens the provider served from its cache
+
+
+@dataclass
+class PromptPrefix:
+    """
+    Stable leading part of a prompt, sent ahead of the variable part so every call
+    of a prompt version (or of one job) starts with the same text.
+    The key names the prompt version and, for job-specific context, the job,
+    e.g. "resume_extraction:v1" or "profile_creation:v1:job:<job_id>".
+    """
+    key: str
+    content: str
+
+
+class LLMProvider(ABC):
+    """
+    Model backend used by LLMService.
+    Contents are a prompt string or a list of parts: strings, image parts ({"mime_type", "data"})
+    and document handles returned by upload_document.
+    """
+    name: str = ""
+
+    @abstractmethod
+    def generate(self, model: str, contents: Union[str, List[Any]], schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None, task: Optional[str] = None,
+                 prefix: Optional[PromptPrefix] = None) -> LLMResponse:
+        """
+        Generate a completion, constrained to JSON matching `schema` when one is given.
+        `prefix` is sent ahead of contents.
+        """
+        pass
+
+    @abstractmethod
+    def upload_document(self, path: str) -> Any:
+        """Make a document (PDF, DOCX) available as a content part"""
+        pass
+
+
+def with_prefix(contents: Union[str, List[Any]], prefix: PromptPrefix) -> List[Any]:
+    """Prepend the prefix to the prompt contents"""
+    return [prefix.content, *(contents if isinstance(contents, list) else [contents])]
+
+
+"""
+*******************************************************************************************************************
+Gemini
+"""
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str):
+        self.__api_key = api_key
+        self.__models: Dict[str, Any] = {}
+        self.__genai = None
+
+    def __client(self):
+        if self.__genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.__api_key)
+            self.__genai = genai
+        return self.__genai
+
+    def __model(self, model: str):
+        if model not in self.__models:
+            try:
+                print(f"Initializing Gemini model {model}...")
+                self.__models[model] = self.__client().GenerativeModel(model)
+                print("Model initialized successfully")
+            except Exception as e:
+                print(f"Failed to initialize model: {e}")
+                raise
+        return self.__models[model]
+
+    @staticmethod
+    def __generation_config(schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Constrain the model to JSON output, using the task schema when Gemini can express it"""
+        if schema is None:
+            return None
+
+        generation_config = {"response_mime_type": "application/json"}
+        gemini_schema = to_gemini_schema(schema)
+        if gemini_schema:
+            generation_config["response_schema"] = gemini_schema
+        return generation_config
+
+    def generate(self, model: str, contents: Union[str, List[Any]], schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None, task: Optional[str] = None,
+                 prefix: Optional[PromptPrefix] = None) -> LLMResponse:
+        if prefix:
+            contents = with_prefix(contents, prefix)
+
+        response = self.__model(model).generate_content(
+            contents,
+            generation_config=self.__generation_config(schema),
+            request_options={"timeout": timeout} if timeout else None
+        )
+        if not response or not response.text:
+            raise ValueError("Empty response from model")
+
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=response.text.strip(),
+            input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+            cached_tokens=getattr(usage, "cached_content_token_count", 0) or 0
+        )
+
+    def upload_document(self, path: str) -> Any:
+        genai = self.__client()
+        uploaded_file = genai.upload_file(path=path)
+        print(f"Uploaded file '{uploaded_file.display_name}' as: {uploaded_file.uri}")
+        return uploaded_file
+
+
+"""
+*******************************************************************************************************************
+Offline
+"""
+
+
+class OfflineProvider(LLMProvider):
+    """
+    Deterministic provider for offline runs and load tests, no network access.
+
+    Responses are looked up in the fixtures folder, first as an exact replay
+    ({fixtures_path}/{task}/{prompt_hash}.json), then as a per-task default ({fixtures_path}/{task}.json).
+    Without a fixture, structured calls get the smallest document that satisfies the task schema.
+    Every call sleeps for the configured latency so throughput can be measured.
+    """
+    name = "offline"
+
+    def __init__(self, latency_ms: float = 0.0, fixtures_path: Optional[str] = None):
+        self.latency_ms = latency_ms
+        self.fixtures_path = Path(fixtures_path) if fixtures_path else None
+
+    @staticmethod
+    def prompt_hash(contents: Union[str, List[Any]]) -> str:
+        """Stable hash of the text parts of a prompt, used as the fixture file name"""
+        parts = contents if isinstance(contents, list) else [contents]
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, str):
+                digest.update(part.encode("utf-8"))
+            elif isinstance(part, dict) and "path" in part:
+                digest.update(str(part["path"]).encode("utf-8"))
+            elif isinstance(part, dict) and isinstance(part.get("data"), bytes):
+                digest.update(part["data"])
+        return digest.hexdigest()[:16]
+
+    def __load_fixture(self, task: Optional[str], contents: Union[str, List[Any]]) -> Optional[str]:
+        if not self.fixtures_path or not task:
+            return None
+
+        for candidate in (self.fixtures_path / task / f"{self.prompt_hash(contents)}.json",
+                          self.fixtures_path / f"{task}.json"):
+            if candidate.exists():
+                return candidate.read_text(encoding="utf-8")
+        return None
+
+    @classmethod
+    def synthesize(cls, schema: Dict[str, Any], field_name: str = "") -> Any:
+        """Build the smallest deterministic value that satisfies a JSON Schema"""
+        types = schema.get("type", "object")
+        schema_type = next((t for t in (types if isinstance(types, list) else [types]) if t != "null"), "null")
+
+        if "enum" in schema:
+            return next(v for v in schema["enum"] if v is not None)
+        if schema_type == "object":
+            return {
+                name: cls.synthesize(sub_schema, name)
+                for name, sub_schema in schema.get("properties", {}).items()
+            }
+        if schema_type == "array":
+            return [cls.synthesize(schema.get("items", {}), field_name) for _ in range(schema.get("minItems", 0))]
+        if schema_type in ("number", "integer"):
+            value = max(schema.get("minimum", 0), 1 if "exclusiveMinimum" in schema else 0)
+            return int(value) if schema_type == "integer" else float(value)
+        if schema_type == "boolean":
+            return False
+        if schema_type == "string":
+            lowered = field_name.lower()
+            if "datetime" in lowered:
+                return "2025-01-06T09:00:00"
+            if lowered.endswith("date"):
+                return "2025-01-06"
+            if "email" in lowered:
+                return "offline@example.com"
+            return f"offline-{field_name}" if field_name else "offline"
+        return None
+
+    def generate(self, model: str, contents: Union[str, List[Any]], schema: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None, task: Optional[str] = None,
+                 prefix: Optional[PromptPrefix] = None) -> LLMResponse:
+        if prefix:
+            contents = with_prefix(contents, prefix)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        text = self.__load_fixture(task, contents)
+        if text is None:
+            text = json.dumps(self.synthesize(schema)) if schema else f"offline response for {task or 'prompt'}"
+
+        prompt_text = " ".join(p for p in (contents if isinstance(contents, list) else [contents])
+                               if isinstance(p, str))
+        # Rough token estimate, about four characters per token
+        return LLMResponse(text=text, input_tokens=len(prompt_text) // 4, output_tokens=len(text) // 4)
+
+    def upload_document(self, path: str) -> Any:
+        mime_type, _ = mimetypes.guess_type(path)
+        return {"mime_type": mime_type or "application/octet-stream", "path": os.path.abspath(path)}
+
+
+def create_provider(llm_config: Dict[str, Any]) -> LLMProvider:
+    """Build the provider selected by `llm.provider` in Config.yaml"""
+    provider_name = llm_config.get("provider", "gemini")
+
+    if provider_name == "gemini":
+        return GeminiProvider(llm_config["genai_token"])
+    if provider_name == "offline":
+        offline_config = llm_config.get("offline") or {}
+        return OfflineProvider(
+            latency_ms=offline_config.get("latency_ms", 0),
+            fixtures_path=offline_config.get("fixtures_path")
+        )
+
+    raise ValueError(f"Unknown LLM provider: {provider_name}")
@@ -0,0 +1,502 @@
+import json
+import re
+from typing import Dict, Any, Optional
+
+from jsonschema import Draft7Validator
+
+"""
+*******************************************************************************************************************
+Response schemas for every structured LLM task.
+
+Each schema is declared once as plain JSON Schema. It is used both to constrain the model output
+(see to_gemini_schema) and to validate the parsed response (see parse_structured_response).
+"""
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_SCORE = {"type": "number", "minimum": 0, "maximum": 100}
+
+RESUME_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "personalInformation": {
+            "type": "object",
+            "properties": {
+                "fullName": {"type": "string", "minLength": 1},
+                "email": {"type": "string", "minLength": 1},
+                "phoneNumbers": _STRING_LIST,
+                "address": _NULLABLE_STRING,
+                "linkedinUrl": _NULLABLE_STRING,
+                "githubUrl": _NULLABLE_STRING,
+                "githubHandle": _NULLABLE_STRING,
+                "linkedinHandle": _NULLABLE_STRING,
+                "portfolioUrl": _NULLABLE_STRING
+            },
+            "required": ["fullName", "email"]
+        },
+        "education": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "institution": {"type": "string"},
+                    "degree": {"type": "string"},
+                    "fieldOfStudy": _NULLABLE_STRING,
+                    "startDate": _NULLABLE_STRING,
+                    "endDate": _NULLABLE_STRING,
+                    "gpa": {"type": ["number", "null"]},
+                    "description": _NULLABLE_STRING,
+                    "location": _NULLABLE_STRING
+                },
+                "required": ["institution", "degree"]
+            }
+        },
+        "workExperience": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "company": {"type": "string"},
+                    "position": {"type": "string"},
+                    "employmentType": {
+                        "type": ["string", "null"],
+                        "enum": ["full_time", "part_time", "contract", "freelance", "internship", None]
+                    },
+                    "startDate": _NULLABLE_STRING,
+                    "endDate": _NULLABLE_STRING,
+                    "isCurrent": {"type": "boolean"},
+                    "location": _NULLABLE_STRING,
+                    "description": _NULLABLE_STRING,
+                    "achievements": _STRING_LIST
+                },
+                "required": ["company", "position"]
+            }
+        },
+        "technicalSkills": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "skillName": {"type": "string"},
+                    "proficiencyLevel": _NULLABLE_STRING,
+                    "yearsExperience": {"type": ["integer", "null"]}
+                },
+                "required": ["skillName"]
+            }
+        },
+        "softSkills": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "skillName": {"type": "string"}
+                },
+                "required": ["skillName"]
+            }
+        },
+        "keywords": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "keyword": {"type": "string"},
+                    "category": _NULLABLE_STRING
+                },
+                "required": ["keyword"]
+            }
+        }
+    },
+    "required": ["personalInformation", "keywords", "workExperience", "education", "technicalSkills"]
+}
+
+PROFILE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "overallMatch": {
+            "type": "object",
+            "properties": {
+                "score": _SCORE,
+                "details": {"type": "string"}
+            },
+            "required": ["score"]
+        },
+        "technicalSkills": {
+            "type": "object",
+            "properties": {
+                "score": _SCORE,
+                "skillMatches": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "skill": {"type": "string"},
+                            "jobRelevance": {"type": "number"},
+                            "candidateProficiency": {"type": "number"}
+                        },
+                        "required": ["skill"]
+                    }
+                },
+                "frameworksAndTools": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "proficiency": {"type": "number"}
+                        },
+                        "required": ["name"]
+                    }
+                }
+            },
+            "required": ["score"]
+        },
+        "softSkills": {
+            "type": "object",
+            "properties": {
+                "score": _SCORE,
+                "skillMatches": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "skill": {"type": "string"},
+                            "proficiency": {"type": "number"}
+                        },
+                        "required": ["skill"]
+                    }
+                }
+            },
+            "required": ["score"]
+        },
+        "experience": {
+            "type": "object",
+            "properties": {
+                "score": _SCORE,
+                "yearsOfExperience": {"type": "number"},
+                "industryExperience": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "industry": {"type": "string"},
+                            "years": {"type": "number"}
+                        },
+                        "required": ["industry"]
+                    }
+                },
+                "relevantRoles": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "company": {"type": "string"},
+                            "duration": {"type": "number"}
+                        },
+                        "required": ["title"]
+                    }
+                }
+            },
+            "required": ["score"]
+        },
+        "education": {
+            "type": "object",
+            "properties": {
+                "score": _SCORE,
+                "degrees": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "degree": {"type": "string"},
+                            "major": {"type": "string"},
+                            "institution": {"type": "string"}
+                        },
+                        "required": ["degree"]
+                    }
+                }
+            },
+            "required": ["score"]
+        },
+        "projectsAndAchievements": {
+            "type": "object",
+            "properties": {
+                "score": _SCORE,
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "description": {"type": "string"},
+                            "relevance": {"type": "number"}
+                        },
+                        "required": ["name"]
+                    }
+                }
+            },
+            "required": ["score"]
+        },
+        "socialPresence": {
+            "type": "object",
+            "properties": {
+                "score": _SCORE,
+                "linkedInActivityScore": {"type": "number"},
+                "githubContributionScore": {"type": "number"},
+                "blogPostScore": {"type": "number"}
+            },
+            "required": ["score"]
+        },
+        "diversity": {"type": "boolean"}
+    },
+    "required": ["overallMatch", "technicalSkills", "softSkills", "experience", "education",
+                 "projectsAndAchievements", "socialPresence"]
+}
+
+PROFILE_VERIFICATION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "is_match": {"type": "boolean"},
+        "confidence_score": _SCORE,
+        "reasoning": {"type": "string"},
+        "matching_elements": _STRING_LIST,
+        "discrepancies": _STRING_LIST
+    },
+    "required": ["is_match", "confidence_score", "reasoning"]
+}
+
+INTERVIEW_SCHEDULE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "interviews": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "candidate_id": {"type": "string"},
+                    "interviewer_id": {"type": "string"},
+                    "start_datetime": {"type": "string"},
+                    "end_datetime": {"type": "string"},
+                    "duration_minutes": {"type": "integer", "exclusiveMinimum": 0},
+                    "location": {
+                        "type": "object",
+                        "properties": {
+                            "type": {"type": "string", "enum": ["virtual", "in_person"]},
+                            "details": {"type": "string"}
+                        },
+                        "required": ["type"]
+                    },
+                    "meeting_link": _NULLABLE_STRING,
+                    "requirements": _STRING_LIST
+                },
+                "required": ["candidate_id", "interviewer_id", "start_datetime", "end_datetime",
+                             "duration_minutes", "location"]
+            }
+        },
+        "constraints_satisfied": {"type": "boolean"},
+        "schedule_metadata": {
+            "type": "object",
+            "properties": {
+                "total_interviews": {"type": "integer"},
+                "total_duration_hours": {"type": "number"},
+                # Date -> number of interviews, keys are not known up front
+                "daily_distribution": {
+                    "type": "object",
+                    "additionalProperties": {"type": "integer"}
+                }
+            },
+            "required": ["total_interviews", "total_duration_hours", "daily_distribution"]
+        }
+    },
+    "required": ["interviews", "constraints_satisfied", "schedule_metadata"]
+}
+
+NOTIFICATION_EMAIL_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "subject": {"type": "string"},
+        "content": {"type": "string"},
+        "notification_type": {"type": "string", "enum": ["acceptance", "rejection"]},
+        "personalization": {
+            "type": "object",
+            "properties": {
+                "candidate_name": {"type": "string"},
+                "custom_fields": {
+                    "type": "object",
+                    "properties": {
+                        "interview_date": {"type": "string"},
+                        "interview_time": {"type": "string"},
+                        "interview_location": {"type": "string"},
+                        "key_strengths": _STRING_LIST,
+                        "preparation_tips": _STRING_LIST,
+                        "position": {"type": "string"},
+                        "feedback": {
+                            "type": "object",
+                            "properties": {
+                                "main_reasons": _STRING_LIST,
+                                "technical_gaps": {
+                                    "type": "object",
+                                    "properties": {
+                                        "missing_skills": _STRING_LIST,
+                                        "improvement_areas": _STRING_LIST
+                                    }
+                                },
+                                "experience_feedback": {
+                                    "type": "object",
+                                    "properties": {
+                                        "strengths": _STRING_LIST,
+                                        "gaps": _STRING_LIST
+                                    }
+                                },
+                                "portfolio_feedback": {"type": "string"},
+                                "professional_presence": {
+                                    "type": "object",
+                                    "properties": {
+                                        "strengths": _STRING_LIST,
+                                        "improvement_tips": _STRING_LIST
+                                    }
+                                },
+                                "action_items": _STRING_LIST
+                            }
+                        }
+                    }
+                }
+            },
+            "required": ["candidate_name", "custom_fields"]
+        },
+        "metadata": {
+            "type": "object",
+            "properties": {
+                "priority": {"type": "string"},
+                "send_time": {"type": "string"}
+            }
+        }
+    },
+    "required": ["subject", "content", "notification_type", "personalization", "metadata"]
+}
+
+EMAIL_EXTRACTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "is_job_application": {"type": "boolean"},
+        "has_missing_fields": {"type": "boolean"},
+        "missing_fields": _STRING_LIST,
+        "extracted_info": {
+            "type": "object",
+            "properties": {
+                "first_name": _NULLABLE_STRING,
+                "middle_name": _NULLABLE_STRING,
+                "last_name": _NULLABLE_STRING,
+                "job_id": _NULLABLE_STRING
+            }
+        }
+    },
+    "required": ["is_job_application", "has_missing_fields", "missing_fields", "extracted_info"]
+}
+
+
+"""
+*******************************************************************************************************************
+Schema helpers
+"""
+
+# Keywords understood by Gemini's response_schema (an OpenAPI subset)
+_GEMINI_SCHEMA_KEYS = {"type", "description", "nullable", "enum", "items", "properties", "required",
+                       "minItems", "maxItems"}
+_GEMINI_KEY_NAMES = {"minItems": "min_items", "maxItems": "max_items"}
+
+
+def to_gemini_schema(schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a JSON Schema into the response_schema format accepted by Gemini.
+    Returns None when the schema uses constructs Gemini cannot express (free-form objects),
+    in which case the caller should fall back to plain JSON mode.
+    """
+    converted = {}
+    for key, value in schema.items():
+        if key not in _GEMINI_SCHEMA_KEYS:
+            continue
+
+        if key == "type":
+            types = value if isinstance(value, list) else [value]
+            non_null = [t for t in types if t != "null"]
+            if len(non_null) != 1:
+                return None
+            converted["type"] = non_null[0].upper()
+            if "null" in types:
+                converted["nullable"] = True
+        elif key == "enum":
+            converted["enum"] = [v for v in value if v is not None]
+        elif key == "items":
+            items = to_gemini_schema(value)
+            if items is None:
+                return None
+            converted["items"] = items
+        elif key == "properties":
+            properties = {}
+            for name, sub_schema in value.items():
+                sub = to_gemini_schema(sub_schema)
+                if sub is None:
+                    return None
+                properties[name] = sub
+            converted["properties"] = properties
+        else:
+            converted[_GEMINI_KEY_NAMES.get(key, key)] = value
+
+    if converted.get("type") == "OBJECT" and not converted.get("properties"):
+        return None
+    return converted
+
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM response is not valid JSON or does not match the task schema"""
+    pass
+
+
+def extract_json_from_response(response_text: str) -> dict:
+    """Extract JSON from response text"""
+    try:
+        # First attempt: Try to parse the entire response as JSON
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        pass
+
+    # Second attempt: Try to find JSON within markdown code blocks
+    code_block_pattern = r"```(?:json)?\s*([\s\S]*?)\s*```"
+    for match in re.findall(code_block_pattern, response_text):
+        try:
+            return json.loads(match)
+        except json.JSONDecodeError:
+            continue
+
+    # Third attempt: Try to find JSON between curly braces
+    json_pattern = r"\{[\s\S]*\}"
+    for match in re.findall(json_pattern, response_text):
+        try:
+            return json.loads(match)
+        except json.JSONDecodeError:
+            continue
+
+    raise StructuredOutputError("No valid JSON found in the response")
+
+
+def parse_structured_response(response_text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse an LLM response and validate it against the task schema.
+    Raises StructuredOutputError listing every schema violation found.
+    """
+    if not response_text:
+        raise StructuredOutputError("Empty response from LLM")
+
+    parsed_data = extract_json_from_response(response_text)
+
+    errors = sorted(Draft7Validator(schema).iter_errors(parsed_data), key=lambda e: list(e.absolute_path))
+    if errors:
+        messages = [
+            f"{'/'.join(str(p) for p in error.absolute_path) or '<root>'}: {error.message}"
+            for error in errors
+        ]
+        raise StructuredOutputError(f"Response does not match schema: {messages}")
+
+    return parsed_data
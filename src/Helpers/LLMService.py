@@ -3,73 +3,173 @@ import json
 import time
 from dataclasses import dataclass
 from datetime import datetime
+from enum import Enum
 from typing import Dict, Any, Union, List, Optional, Callable
 from pathlib import Path
-import pdf2image
-from PIL import Image
-from docx2pdf import convert
-import base64
-import io
-import google.generativeai as genai
 
+from src.Helpers.DocumentConversion import get_document_converter, SUPPORTED_DOCUMENT_EXTENSIONS
+from src.Helpers.LLMProviders import LLMProvider, LLMResponse, PromptPrefix, create_provider
+from src.Helpers.LLMSchemas import (
+    RESUME_SCHEMA, PROFILE_SCHEMA, PROFILE_VERIFICATION_SCHEMA, INTERVIEW_SCHEDULE_SCHEMA,
+    NOTIFICATION_EMAIL_SCHEMA, EMAIL_EXTRACTION_SCHEMA, StructuredOutputError, parse_structured_response
+)
+from src.Helpers.RetryPolicy import RetryPolicy, RetryBudgetExhausted, RetryDeadlineExceeded, classify_error
+from src.Modules.LLMUsage.LLMUsageService import LLMUsageService
 from src.config.ConfigBase import Config
 
 
+# Bump when the resume extraction instructions change, the prompt prefix key names the version
+RESUME_PROMPT_VERSION = "v1"
+
+
+class LLMTask(Enum):
+    COMPLETION = "completion"
+    RESUME_EXTRACTION = "resume_extraction"
+    PROFILE_CREATION = "profile_creation"
+    PROFILE_VERIFICATION = "profile_verification"
+    INTERVIEW_SCHEDULE = "interview_schedule"
+    NOTIFICATION_EMAIL = "notification_email"
+    EMAIL_EXTRACTION = "email_extraction"
+
+
+@dataclass
+class TaskRoute:
+    model: str
+    fallback_model: Optional[str]
+    retry_policy: RetryPolicy
+
+
 class LLMService:
     def __init__(self):
         self.config = Config()
-        self.api_key = self.config.getConfig()["llm"]["genai_token"] #
-        self.__POPPLER_PATH = self.config.getConfig()["llm"]["poppler_path"] #
-        self._model = None
-        self._max_retries = 3
-        self._retry_delay = 2  # seconds
-
-
-    def _ensure_model_initialized(self) -> None:
-        """Ensures model is initialized before use"""
-        if not self._model:
-            self._model = self.__init_gemini()
+        llm_config = self.config.getConfig()["llm"]
+        self._provider: LLMProvider = create_provider(llm_config)
+        self._default_route = self.__build_route(llm_config, {})
+        self._routes = {
+            task: self.__build_route(llm_config, (llm_config.get("routing") or {}).get(task.value) or {})
+            for task in LLMTask
+        }
+        self._usage_service = LLMUsageService()
 
-    def __init_gemini(self):
-        try:
-            print("Initializing Gemini Pro Vision model...")
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            print("Model initialized successfully")
-            return model
-        except Exception as e:
-            print(f"Failed to initialize model: {e}")
-            raise
+    @staticmethod
+    def __build_route(llm_config: Dict[str, Any], route_config: Dict[str, Any]) -> TaskRoute:
+        """Resolve a task's model, fallback model, timeout and retry settings, defaulting to the llm section"""
+        retry_overrides = dict(route_config.get("retry") or {})
+        if route_config.get("timeout"):
+            retry_overrides["attempt_timeout"] = route_config["timeout"]
+
+        return TaskRoute(
+            model=route_config.get("model") or llm_config.get("model", "gemini-1.5-flash"),
+            fallback_model=route_config.get("fallback_model", llm_config.get("fallback_model")),
+            retry_policy=RetryPolicy.from_config(retry_overrides)
+        )
+
+    def __generate(self, task: LLMTask, contents: Union[str, List[Any]],
+                   schema: Optional[Dict[str, Any]] = None,
+                   prefix: Optional[PromptPrefix] = None) -> Union[str, Dict[str, Any]]:
+        """
+        Runs a task on its routed model and falls back to the secondary model when the response
+        does not match the schema or the model kept failing with retryable errors.
+        Permanent errors (auth, invalid request) and an exhausted retry budget are raised right away.
+        """
+        route = self._routes.get(task, self._default_route)
+        models = [route.model] + ([route.fallback_model] if route.fallback_model else [])
 
-    def _retry_with_delay(self, func: Callable, *args, **kwargs):
-        """Retries function with exponential backoff"""
-        for attempt in range(self._max_retries):
+        for index, model in enumerate(models):
             try:
-                return func(*args, **kwargs)
+                response_text = self.__generate_with_model(task, model, route.retry_policy, contents, schema, prefix)
+                return parse_structured_response(response_text, schema) if schema else response_text
             except Exception as e:
-                if attempt == self._max_retries - 1:
+                if index == len(models) - 1 or not self.__should_fall_back(e):
                     raise
-                wait_time = self._retry_delay * (2 ** attempt)
-                print(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait_time}s...")
-                time.sleep(wait_time)
+                print(f"Task {task.value} failed on {model}: {e}. Falling back to {models[index + 1]}...")
+
+    @staticmethod
+    def __should_fall_back(error: Exception) -> bool:
+        """Whether another model may succeed where this one failed"""
+        if isinstance(error, StructuredOutputError):
+            return True
+        # Provider errors arrive wrapped by __generate_with_model
+        cause = error.__cause__ or error
+        if isinstance(cause, RetryBudgetExhausted):
+            return False
+        if isinstance(cause, RetryDeadlineExceeded):
+            cause = cause.__cause__ or cause
+        return classify_error(cause).retryable
+
+    def __generate_with_model(self, task: LLMTask, model: str, retry_policy: RetryPolicy,
+                              contents: Union[str, List[Any]], schema: Optional[Dict[str, Any]] = None,
+                              prefix: Optional[PromptPrefix] = None) -> str:
+        """
+        Runs one provider call under the retry policy and records its usage:
+        tokens from the response metadata, wall time including retries and the number of retries
+        """
+        attempts = 0
+        response: Optional[LLMResponse] = None
 
-    def complete_prompt(self, prompt: str) -> str:
         def _execute_prompt():
-            self._ensure_model_initialized()
-            response = self._model.generate_content(prompt)
-            if not response or not response.text:
-                raise ValueError("Empty response from model")
-            return response.text.strip()
+            nonlocal attempts, response
+            attempts += 1
+            response = self._provider.generate(
+                model,
+                contents,
+                schema=schema,
+                timeout=retry_policy.attempt_timeout,
+                task=task.value,
+                prefix=prefix
+            )
+            return response.text
 
+        started = time.perf_counter()
         try:
-            return self._retry_with_delay(_execute_prompt)
+            response_text = retry_policy.call(_execute_prompt)
         except Exception as e:
-            raise Exception(f"Failed to complete prompt after {self._max_retries} attempts: {str(e)}")
+            self.__record_usage(task, model, response, started, attempts, error=str(e))
+            raise Exception(f"Failed to complete prompt: {str(e)}") from e
+
+        self.__record_usage(task, model, response, started, attempts)
+        return response_text
+
+    def __record_usage(self, task: LLMTask, model: str, response: Optional[LLMResponse], started: float,
+                       attempts: int, error: Optional[str] = None) -> None:
+        self._usage_service.record_call(
+            task=task.value,
+            model=model,
+            input_tokens=response.input_tokens if response else 0,
+            output_tokens=response.output_tokens if response else 0,
+            cached_input_tokens=response.cached_tokens if response else 0,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            retry_count=max(attempts - 1, 0),
+            success=error is None,
+            error=error
+        )
+
+    def complete_prompt(self, prompt: str, task: LLMTask = LLMTask.COMPLETION) -> str:
+        return self.__generate(task, prompt)
+
+    def complete_structured(self, prompt: Union[str, List[Any]], schema: Dict[str, Any],
+                            task: LLMTask = LLMTask.COMPLETION,
+                            prefix: Optional[PromptPrefix] = None) -> Dict[str, Any]:
+        """
+        Completes a prompt under a structured-output constraint and validates the result against the schema.
+        Only retryable model errors are retried on the same model, a response that fails validation
+        goes to the task's fallback model if it has one and is raised otherwise.
+        `prefix` holds stable instructions or context, sent ahead of the prompt.
+        """
+        return self.__generate(task, prompt, schema, prefix)
 
     """
     *******************************************************************************************************************
     For Resume text extraction
     """
+    @classmethod
+    def __resume_prompt_prefix(cls) -> PromptPrefix:
+        """The resume instructions are identical for every resume, so they are sent as a separate prefix"""
+        return PromptPrefix(
+            key=f"{LLMTask.RESUME_EXTRACTION.value}:{RESUME_PROMPT_VERSION}",
+            content=cls.__genPromptToExtractDataFromResume()
+        )
+
     @staticmethod
     def __genPromptToExtractDataFromResume() -> str:
         """Generate prompt for resume parsing with strict alignment to defined database models"""
@@ -105,7 +205,7 @@ class LLMService:
                 {
                     "company": "",
                     "position": "",
-                    "employmentType": "",  // Must be one of ["full_time", "part_time", "contract", "freelance", "internship"]
+                    "employmentType": null,  // Nullable, one of ["full_time", "part_time", "contract", "freelance", "internship"]
                     "startDate": "YYYY-MM-DD",
                     "endDate": "YYYY-MM-DD",  // Nullable
                     "isCurrent": false,
@@ -174,82 +274,42 @@ class LLMService:
         keywords based on the candidate’s experience and expertise.
         """
 
-    @staticmethod
-    def __validate_resume_data(data: Dict[str, Any]) -> None:
-        """Validate the parsed resume data"""
-        required_sections = [
-            'personalInformation',
-            'keywords',
-            'workExperience',
-            'education',
-            'technicalSkills'
-        ]
-
-        missing_sections = [section for section in required_sections if section not in data]
-        if missing_sections:
-            raise ValueError(f"Missing required sections in parsed data: {missing_sections}")
-
-        # Validate personal information
-        personal_info = data['personalInformation']
-        required_personal_fields = ['fullName', 'email']
-        missing_personal_fields = [field for field in required_personal_fields if not personal_info.get(field)]
-        if missing_personal_fields:
-            raise ValueError(f"Missing required personal information fields: {missing_personal_fields}")
-
-
     def parse_resume_with_vision(self, resume_path: str) -> Dict[str, Any]:
         """
-        Parse resume using Gemini Vision capabilities
+        Parse resume using the provider's vision capabilities
         Returns structured data from the resume
         """
         try:
             file_extension = Path(resume_path).suffix.lower()
-            if file_extension in ['.pdf', '.docx']:
-                return self.parse_resume_document(resume_path)
-            else:
-                _resume_path = Path(resume_path)
-                # Convert document to images
-                print("Converting document to images...")
-                document_images = self.__convert_document_to_images(_resume_path)
-
-                if not document_images:
+            if file_extension not in SUPPORTED_DOCUMENT_EXTENSIONS:
+                raise ValueError(f"Unsupported resume format '{file_extension}', "
+                                 f"expected one of {', '.join(SUPPORTED_DOCUMENT_EXTENSIONS)}")
+
+            # Rasterise in the conversion process pool (DOCX is converted to PDF there first),
+            # the pages come back as PNG files
+            print("Converting document to images...")
+            with get_document_converter().convert_to_images(resume_path) as document_pages:
+                if not document_pages.page_paths:
                     raise ValueError("No images could be extracted from the document")
 
-                print(f"Successfully converted document to {len(document_images)} images")
+                print(f"Successfully converted document to {len(document_pages.page_paths)} images")
 
-                # Initialize model
-                print("Initializing Gemini model...")
-                model = self.__init_gemini()
-                prompt = self.__genPromptToExtractDataFromResume()
-
-                # Process each image with the model
-                all_responses = []
-                for img_data in document_images:
-                    # Extract base64 data from the data URL
-                    base64_data = img_data.split('base64,')[1]
-
-                    # Create the image part in the correct format for Gemini
-                    image_part = {
+                # Send every page in a single request so the model returns one resume object
+                image_parts = [
+                    {
                         "mime_type": "image/png",
-                        "data": base64_data
+                        "data": Path(page_path).read_bytes()
                     }
+                    for page_path in document_pages.page_paths
+                ]
 
-                    # Generate content with both prompt and image
-                    response = model.generate_content([
-                        prompt,
-                        image_part
-                    ])
-                    all_responses.append(response.text)
-
-                # Combine and parse responses
-                combined_response = "\n".join(all_responses)
-                parsed_data = self.__extract_json_from_response(combined_response)
-                print("Successfully extracted JSON data from response")
-                print(json.dumps(parsed_data, indent=4))
-                self.__validate_resume_data(parsed_data)
-                print("Data validation successful")
+                parsed_data = self.complete_structured(
+                    image_parts, RESUME_SCHEMA, LLMTask.RESUME_EXTRACTION, self.__resume_prompt_prefix()
+                )
+            print("Successfully extracted JSON data from response")
+            print(json.dumps(parsed_data, indent=4))
 
-                return parsed_data
+            return parsed_data
 
         except Exception as e:
             raise Exception(f"Error parsing resume with vision: {str(e)}")
@@ -259,123 +319,20 @@ class LLMService:
     For Profile creation
     """
 
-    def create_profile(self, prompt: str) -> Dict[str, Any]:
+    def create_profile(self, prompt: str, job_prefix: Optional[PromptPrefix] = None) -> Dict[str, Any]:
         """
-        Creates a profile analysis using the provided prompt
+        Creates a profile analysis using the provided prompt.
+        job_prefix carries the instructions and job requirements shared by every applicant to the job.
         Returns validated profile data
         """
         try:
-            response_text = self.complete_prompt(prompt)
-            parsed_data = self.__extract_json_from_response(response_text)
-
-            required_fields = [
-                "overallMatch", "technicalSkills",
-                "softSkills", "experience", "education", "projectsAndAchievements",
-                "socialPresence"
-            ]
-
-            missing_fields = [f for f in required_fields if f not in parsed_data]
-            if missing_fields:
-                raise ValueError(f"Missing required fields in profile data: {missing_fields}")
-
-            required_scores = ["technicalSkills", "softSkills", "experience",
-                               "education", "projectsAndAchievements", "socialPresence"]
-
-            for field in required_scores:
-                score = parsed_data[field].get("score")
-                if not isinstance(score, (int, float)) or not 0 <= score <= 100:
-                    raise ValueError(f"Invalid score in {field}")
-
-            overall_score = parsed_data["overallMatch"].get("score")
-            if not isinstance(overall_score, (int, float)) or not 0 <= overall_score <= 100:
-                raise ValueError("Invalid overall match score")
-
-            return parsed_data
+            return self.complete_structured(prompt, PROFILE_SCHEMA, LLMTask.PROFILE_CREATION, job_prefix)
 
         except Exception as e:
             raise Exception(f"Failed to create profile: {str(e)}")
 
 
 
-    """
-    *******************************************************************************************************
-    Helper functions
-    """
-    @staticmethod
-    def __extract_json_from_response(response_text: str) -> dict:
-        """Extract JSON from response text"""
-        try:
-            # First attempt: Try to parse the entire response as JSON
-            return json.loads(response_text)
-        except json.JSONDecodeError:
-            # Second attempt: Try to find JSON within markdown code blocks
-            import re
-            code_block_pattern = r"```(?:json)?\s*([\s\S]*?)\s*```"
-            matches = re.findall(code_block_pattern, response_text)
-
-            for match in matches:
-                try:
-                    return json.loads(match)
-                except json.JSONDecodeError:
-                    continue
-
-            # Third attempt: Try to find JSON between curly braces
-            json_pattern = r"\{[\s\S]*\}"
-            matches = re.findall(json_pattern, response_text)
-
-            for match in matches:
-                try:
-                    return json.loads(match)
-                except json.JSONDecodeError:
-                    continue
-
-            raise ValueError("No valid JSON found in the response")
-
-
-    def __convert_document_to_images(self, file_path: Union[str, Path]) -> List[str]:
-        """
-        Convert PDF or DOCX document to a list of base64 encoded images
-        Returns list of base64 strings ready for Gemini Vision
-        """
-        try:
-            pdf_path = file_path
-
-            # If document is DOCX, convert to PDF first
-            if str(file_path).lower().endswith('.docx'):
-                pdf_path = file_path.parent / f"{file_path.stem}_temp.pdf"
-                convert(str(file_path), str(pdf_path))
-
-            # Convert PDF to images with explicit poppler path
-            images = pdf2image.convert_from_path(
-                pdf_path,
-                dpi=300,
-                fmt="PNG",
-                poppler_path=self.__POPPLER_PATH  # Explicitly specify poppler path
-            )
-
-            # Convert images to base64
-            images_base64 = []
-            for img in images:
-                # Optimize image size if needed
-                if img.size[0] > 2000:  # If width is greater than 2000px
-                    ratio = 2000 / img.size[0]
-                    new_size = (2000, int(img.size[1] * ratio))
-                    img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-                buffered = io.BytesIO()
-                img.save(buffered, format="PNG", optimize=True)
-                img_base64 = base64.b64encode(buffered.getvalue()).decode()
-                images_base64.append(f"data:image/png;base64,{img_base64}")
-
-            # Clean up temporary PDF if converted from DOCX
-            if str(file_path).lower().endswith('.docx') and Path(pdf_path).exists():
-                Path(pdf_path).unlink()
-
-            return images_base64
-
-        except Exception as e:
-            raise Exception(f"Error converting document to images: {str(e)}")
-
     """
     *******************************************************************************************************************
     Profile Verification
@@ -384,23 +341,7 @@ class LLMService:
     def verify_profile(self, prompt: str) -> Dict[str, Any]:
         try:
             print("Starting profile verification...")
-            response_text = self.complete_prompt(prompt)
-
-            if not response_text:
-                raise ValueError("Empty response from LLM")
-
-            parsed_data = self.__extract_json_from_response(response_text)
-
-            required_fields = ['is_match', 'confidence_score', 'reasoning']
-            missing_fields = [f for f in required_fields if f not in parsed_data]
-            if missing_fields:
-                raise ValueError(f"Missing required fields: {missing_fields}")
-
-            if not isinstance(parsed_data['confidence_score'], (int, float)) or \
-                    not 0 <= parsed_data['confidence_score'] <= 100:
-                raise ValueError("Invalid confidence score")
-
-            return parsed_data
+            return self.complete_structured(prompt, PROFILE_VERIFICATION_SCHEMA, LLMTask.PROFILE_VERIFICATION)
 
         except Exception as e:
             raise Exception(f"Profile verification failed: {str(e)}")
@@ -481,61 +422,16 @@ class LLMService:
         """
         try:
             print("Starting interview schedule creation...")
-            response_text = self.complete_prompt(prompt)
-
-            if not response_text:
-                raise ValueError("Empty response from LLM")
-
-            parsed_data = self.__extract_json_from_response(response_text)
+            parsed_data = self.complete_structured(prompt, INTERVIEW_SCHEDULE_SCHEMA, LLMTask.INTERVIEW_SCHEDULE)
 
-            # Validate required top-level fields
-            required_fields = ['interviews', 'constraints_satisfied', 'schedule_metadata']
-            missing_fields = [f for f in required_fields if f not in parsed_data]
-            if missing_fields:
-                raise ValueError(f"Missing required fields: {missing_fields}")
-
-            # Validate interviews array
-            if not isinstance(parsed_data['interviews'], list) or not parsed_data['interviews']:
-                raise ValueError("Invalid or empty interviews array")
-
-            # Validate each interview
+            # Datetime formats are not expressible in the schema
             for interview in parsed_data['interviews']:
-                interview_required_fields = [
-                    'candidate_id', 'interviewer_id', 'start_datetime',
-                    'end_datetime', 'duration_minutes', 'location'
-                ]
-                missing_interview_fields = [f for f in interview_required_fields if f not in interview]
-                if missing_interview_fields:
-                    raise ValueError(f"Missing required interview fields: {missing_interview_fields}")
-
-                # Validate datetime formats
                 try:
                     datetime.fromisoformat(interview['start_datetime'])
                     datetime.fromisoformat(interview['end_datetime'])
                 except ValueError:
                     raise ValueError("Invalid datetime format in interview schedule")
 
-                # Validate location
-                if not isinstance(interview['location'], dict) or \
-                        'type' not in interview['location'] or \
-                        interview['location']['type'] not in ['virtual', 'in_person']:
-                    raise ValueError("Invalid location data")
-
-                # Validate duration is positive
-                if not isinstance(interview['duration_minutes'], int) or interview['duration_minutes'] <= 0:
-                    raise ValueError("Invalid duration_minutes")
-
-            # Validate schedule metadata
-            metadata_required_fields = ['total_interviews', 'total_duration_hours', 'daily_distribution']
-            missing_metadata_fields = [f for f in metadata_required_fields if f not in parsed_data['schedule_metadata']]
-            if missing_metadata_fields:
-                raise ValueError(f"Missing required metadata fields: {missing_metadata_fields}")
-
-            # Validate numerical fields in metadata
-            if not isinstance(parsed_data['schedule_metadata']['total_interviews'], int) or \
-                    not isinstance(parsed_data['schedule_metadata']['total_duration_hours'], (int, float)):
-                raise ValueError("Invalid numerical values in schedule metadata")
-
             return parsed_data
 
         except Exception as e:
@@ -548,51 +444,28 @@ class LLMService:
         Returns validated notification data structure
         """
         try:
-            response_text = self.complete_prompt(prompt)
-            parsed_data = self.__extract_json_from_response(response_text)
-
-            # Validate required fields
-            required_fields = ['subject', 'content', 'notification_type', 'personalization', 'metadata']
-            missing_fields = [f for f in required_fields if f not in parsed_data]
-            if missing_fields:
-                raise ValueError(f"Missing required fields in notification data: {missing_fields}")
-
-            return parsed_data
+            return self.complete_structured(prompt, NOTIFICATION_EMAIL_SCHEMA, LLMTask.NOTIFICATION_EMAIL)
 
         except Exception as e:
             raise Exception(f"Failed to generate notification email: {str(e)}")
 
     def parse_resume_document(self, resume_path: str) -> Dict[str, Any]:
         """
-        Parse resume document (PDF or DOCX) using Gemini Vision capabilities
+        Parse resume document (PDF or DOCX) using the provider's document input
         Returns structured data from the resume
         """
         try:
-            print("Initializing Gemini model...")
-            model = self.__init_gemini()
-            prompt = self.__genPromptToExtractDataFromResume()
-
             print("Uploading resume document...")
-            uploaded_file = genai.upload_file(path=resume_path)
-            print(f"Uploaded file '{uploaded_file.display_name}' as: {uploaded_file.uri}")
+            uploaded_file = self._provider.upload_document(resume_path)
 
-            print("Sending document to Gemini Vision API...")
-            response = model.generate_content(
-                [uploaded_file, prompt]
+            print(f"Sending document to {self._provider.name} provider...")
+            parsed_data = self.complete_structured(
+                [uploaded_file], RESUME_SCHEMA, LLMTask.RESUME_EXTRACTION, self.__resume_prompt_prefix()
             )
-
-            print("Extracting JSON data from response...")
-            parsed_data = self.__extract_json_from_response(response.text)
-
-            self.__validate_resume_data(parsed_data)
             print("Data validation successful")
 
             print("data; ", json.dumps(parsed_data, indent=2))
 
-            # Verify the uploaded file
-            file = genai.get_file(name=uploaded_file.name)
-            print(f"Retrieved file '{file.display_name}' as: {uploaded_file.uri}")
-
             return parsed_data
 
         except Exception as e:
@@ -601,13 +474,7 @@ class LLMService:
     def extract_info_from_email(self, prompt: str) -> Dict[str, Any]:
         try:
             print("Starting email data extraction extraction...")
-            response_text = self.complete_prompt(prompt)
-
-            if not response_text:
-                raise ValueError("Empty response from LLM")
-
-            parsed_data = self.__extract_json_from_response(response_text)
-            return parsed_data
+            return self.complete_structured(prompt, EMAIL_EXTRACTION_SCHEMA, LLMTask.EMAIL_EXTRACTION)
 
         except Exception as e:
             raise Exception(f"Email infor extraction failed: {str(e)}")
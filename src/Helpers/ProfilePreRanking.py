@@ -0,0 +1,106 @@
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Optional, List, Dict, Any, Iterable
+
+# Share of the pre-rank score contributed by each signal, an exact public email match overrides them
+NAME_WEIGHT = 0.6
+LOCATION_WEIGHT = 0.2
+COMPANY_WEIGHT = 0.2
+
+logger = logging.getLogger(__name__)
+
+_COMPANY_SUFFIXES = {"inc", "corp", "corporation", "ltd", "llc", "gmbh", "co", "plc", "ag", "sa", "pvt", "limited"}
+
+
+@dataclass
+class CandidateFacts:
+    """What we know about the candidate from the application and the resume"""
+    full_name: str
+    emails: List[str] = field(default_factory=list)
+    locations: List[str] = field(default_factory=list)
+    companies: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dtos(cls, candidate: Dict[str, Any], resume: Dict[str, Any]) -> "CandidateFacts":
+        personal_info = resume.get("personalInformation") or {}
+        return cls(
+            full_name=f"{candidate.get('firstName', '')} {candidate.get('lastName', '')}".strip(),
+            emails=[e for e in (candidate.get("email"), personal_info.get("email")) if e],
+            locations=[l for l in (candidate.get("location"), personal_info.get("address")) if l],
+            companies=[c for c in [candidate.get("currentCompany")] +
+                       [exp.get("company") for exp in resume.get("workExperience") or []] if c]
+        )
+
+
+@dataclass
+class ProfileLead:
+    """A profile found by search, with whatever cheap public details we have for it"""
+    username: str
+    url: Optional[str] = None
+    name: Optional[str] = None
+    location: Optional[str] = None
+    company: Optional[str] = None
+    email: Optional[str] = None
+    text: str = ""  # free text such as a search snippet or bio, searched for location and company
+    score: float = 0.0
+    exact_email_match: bool = False
+
+
+def _normalise(value: Optional[str]) -> str:
+    value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", " ", value.lower()).strip()
+
+
+def name_similarity(expected: str, found: Optional[str]) -> float:
+    """0..1 similarity of two names, ignoring case, accents, punctuation and word order"""
+    expected_tokens, found_tokens = _normalise(expected).split(), _normalise(found).split()
+    if not expected_tokens or not found_tokens:
+        return 0.0
+
+    ordered = SequenceMatcher(None, " ".join(sorted(expected_tokens)), " ".join(sorted(found_tokens))).ratio()
+    # First and last name present in any order, e.g. with a middle name or initial in between
+    if expected_tokens[0] in found_tokens and expected_tokens[-1] in found_tokens:
+        return max(ordered, 0.9)
+    return ordered
+
+
+def _mentions_any(values: Iterable[str], *texts: Optional[str]) -> bool:
+    haystack = " " + " ".join(_normalise(t) for t in texts if t) + " "
+    for value in values:
+        # Match on the leading part, e.g. the city of "Berlin, Germany" or the name of "Acme Corp."
+        tokens = _normalise(value.split(",")[0]).split()
+        while len(tokens) > 1 and tokens[-1] in _COMPANY_SUFFIXES:
+            tokens.pop()
+        needle = " ".join(tokens)
+        if len(needle) >= 3 and f" {needle} " in haystack:
+            return True
+    return False
+
+
+def score_lead(facts: CandidateFacts, lead: ProfileLead) -> ProfileLead:
+    """Scores a lead from 0 to 1 on name, location and company overlap with the candidate"""
+    lead_email = (lead.email or "").strip().lower()
+    lead.exact_email_match = bool(lead_email) and lead_email in {e.strip().lower() for e in facts.emails}
+    if lead.exact_email_match:
+        lead.score = 1.0
+        return lead
+
+    lead.score = (NAME_WEIGHT * name_similarity(facts.full_name, lead.name or lead.text) +
+                  LOCATION_WEIGHT * _mentions_any(facts.locations, lead.location, lead.text) +
+                  COMPANY_WEIGHT * _mentions_any(facts.companies, lead.company, lead.text))
+    return lead
+
+
+def rank_leads(facts: CandidateFacts, leads: List[ProfileLead], min_score: float,
+               max_leads: int) -> List[ProfileLead]:
+    """
+    Orders leads best first, drops those scoring below min_score and keeps at most max_leads,
+    so only the most plausible profiles get the expensive scrape and LLM verification
+    """
+    scored = sorted((score_lead(facts, lead) for lead in leads), key=lambda l: l.score, reverse=True)
+    for lead in scored:
+        logger.debug("Pre-rank %s: %.2f%s", lead.username, lead.score, " (email match)" if lead.exact_email_match else "")
+    return [lead for lead in scored if lead.score >= min_score][:max_leads]
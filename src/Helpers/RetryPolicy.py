@@ -0,0 +1,297 @@
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Callable, Dict, Any
+
+from src.config.ConfigBase import Config
+
+
+@dataclass
+class RetryDecision:
+    retryable: bool
+    cause: str
+    retry_after: Optional[float] = None  # seconds, from provider back-off hints
+
+
+class RetryBudgetExhausted(Exception):
+    """Raised when a pipeline run has used up its retry budget"""
+    pass
+
+
+class RetryDeadlineExceeded(Exception):
+    """Raised when waiting for the next attempt would overrun the per-call deadline"""
+    pass
+
+
+"""
+*******************************************************************************************************************
+Error classification
+"""
+
+_RETRYABLE_STATUS = {
+    408: "timeout",
+    429: "rate_limited",
+    500: "server_error",
+    502: "server_error",
+    503: "unavailable",
+    504: "timeout",
+}
+
+_PERMANENT_STATUS = {
+    400: "invalid_request",
+    401: "unauthenticated",
+    403: "permission_denied",
+    404: "not_found",
+    422: "invalid_request",
+}
+
+# Exceptions raised by the generative AI SDK when content is blocked, these never succeed on retry
+_PERMANENT_ERROR_NAMES = {
+    "BlockedPromptException": "blocked_content",
+    "StopCandidateException": "blocked_content",
+    "InvalidArgument": "invalid_request",
+    "PermissionDenied": "permission_denied",
+    "Unauthenticated": "unauthenticated",
+}
+
+_NETWORK_ERROR_NAMES = {"ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "TimeoutError",
+                        "ConnectError", "RemoteProtocolError"}
+
+_RETRY_IN_PATTERN = re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+_RETRY_DELAY_PATTERN = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return status
+
+    # google.api_core exceptions carry the HTTP status as `code`
+    code = getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def _retry_after_from_headers(headers) -> Optional[float]:
+    if not headers:
+        return None
+
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                reset_at = parsedate_to_datetime(retry_after)
+                return max((reset_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+    # Quota reset metadata, only meaningful once the remaining quota is spent
+    if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+        try:
+            return max(float(headers["X-RateLimit-Reset"]) - time.time(), 0.0)
+        except ValueError:
+            pass
+
+    return None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    retry_after = _retry_after_from_headers(getattr(response, "headers", None))
+    if retry_after is not None:
+        return retry_after
+
+    # google.rpc.RetryInfo attached to google.api_core exceptions
+    for detail in getattr(error, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+
+    message = str(error)
+    for pattern in (_RETRY_IN_PATTERN, _RETRY_DELAY_PATTERN):
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+
+    return None
+
+
+def classify_error(error: Exception) -> RetryDecision:
+    """Decides whether an error is worth retrying and records why"""
+    error_name = type(error).__name__
+
+    if error_name in _PERMANENT_ERROR_NAMES:
+        return RetryDecision(False, _PERMANENT_ERROR_NAMES[error_name])
+
+    status = _status_code(error)
+    if status in _PERMANENT_STATUS:
+        return RetryDecision(False, _PERMANENT_STATUS[status])
+    if status in _RETRYABLE_STATUS:
+        return RetryDecision(True, _RETRYABLE_STATUS[status], _retry_after(error))
+
+    if error_name in _NETWORK_ERROR_NAMES or isinstance(error, (ConnectionError, TimeoutError)):
+        return RetryDecision(True, "network")
+
+    if isinstance(error, ValueError):
+        if "empty response" in str(error).lower():
+            return RetryDecision(True, "empty_response")
+        return RetryDecision(False, "invalid_response")
+
+    return RetryDecision(True, "unknown", _retry_after(error))
+
+
+"""
+*******************************************************************************************************************
+Retry budget and counters
+"""
+
+
+class RetryBudget:
+    """Caps the number of retries a single pipeline run may spend"""
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_consume(self) -> bool:
+        with self._lock:
+            if self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+
+class RetryStats:
+    """Thread-safe counters of retries and give-ups by cause"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._retries: Dict[str, int] = {}
+        self._give_ups: Dict[str, int] = {}
+
+    def record_retry(self, cause: str) -> None:
+        with self._lock:
+            self._retries[cause] = self._retries.get(cause, 0) + 1
+
+    def record_give_up(self, cause: str) -> None:
+        with self._lock:
+            self._give_ups[cause] = self._give_ups.get(cause, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "retries_by_cause": dict(self._retries),
+                "give_ups_by_cause": dict(self._give_ups),
+                "total_retries": sum(self._retries.values())
+            }
+
+
+retry_stats = RetryStats()
+
+# Each pipeline runs in its own thread, so a thread-local budget is a budget per pipeline run
+_run_state = threading.local()
+
+
+def _retry_config() -> Dict[str, Any]:
+    return (Config().getConfig().get("llm") or {}).get("retry") or {}
+
+
+def start_retry_run(max_retries: Optional[int] = None) -> RetryBudget:
+    """Starts a fresh retry budget for the pipeline run executing on the current thread"""
+    if max_retries is None:
+        max_retries = _retry_config().get("run_budget", 20)
+    _run_state.budget = RetryBudget(max_retries)
+    return _run_state.budget
+
+
+def current_retry_budget() -> Optional[RetryBudget]:
+    return getattr(_run_state, "budget", None)
+
+
+def bind_retry_budget(budget: Optional[RetryBudget]) -> None:
+    """Shares a run's budget with a worker thread started by that run"""
+    _run_state.budget = budget
+
+
+"""
+*******************************************************************************************************************
+Retry policy
+"""
+
+
+class RetryPolicy:
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 2.0,  # seconds
+                 max_delay: float = 60.0,  # seconds
+                 call_deadline: float = 180.0,  # seconds, covers every attempt and wait of one call
+                 attempt_timeout: float = 60.0,  # seconds, for a single attempt
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.call_deadline = call_deadline
+        self.attempt_timeout = attempt_timeout
+        self._sleep = sleep
+
+    @classmethod
+    def from_config(cls, overrides: Optional[Dict[str, Any]] = None) -> "RetryPolicy":
+        settings = {**_retry_config(), **(overrides or {})}
+        return cls(
+            max_attempts=settings.get("max_attempts", 3),
+            base_delay=settings.get("base_delay", 2.0),
+            max_delay=settings.get("max_delay", 60.0),
+            call_deadline=settings.get("call_deadline", 180.0),
+            attempt_timeout=settings.get("attempt_timeout", 60.0),
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the provider's back-off hint"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Calls func, retrying retryable errors until attempts, the call deadline or the run budget run out.
+        The last error is re-raised when giving up.
+        """
+        started = time.monotonic()
+        for attempt in range(self.max_attempts):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                decision = classify_error(e)
+
+                if not decision.retryable:
+                    retry_stats.record_give_up(decision.cause)
+                    raise
+                if attempt == self.max_attempts - 1:
+                    retry_stats.record_give_up("attempts_exhausted")
+                    raise
+
+                wait_time = self.backoff(attempt, decision.retry_after)
+                if time.monotonic() - started + wait_time > self.call_deadline:
+                    retry_stats.record_give_up("deadline_exceeded")
+                    raise RetryDeadlineExceeded(
+                        f"Retry in {wait_time:.1f}s would exceed the {self.call_deadline}s deadline: {e}"
+                    ) from e
+
+                budget = current_retry_budget()
+                if budget is not None and not budget.try_consume():
+                    retry_stats.record_give_up("budget_exhausted")
+                    raise RetryBudgetExhausted(
+                        f"Retry budget of {budget.max_retries} exhausted for this run: {e}"
+                    ) from e
+
+                retry_stats.record_retry(decision.cause)
+                print(f"Attempt {attempt + 1} failed ({decision.cause}): {e}. Retrying in {wait_time:.1f}s...")
+                self._sleep(wait_time)
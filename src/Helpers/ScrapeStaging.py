@@ -0,0 +1,51 @@
+import threading
+from typing import Any, Optional
+
+from src.Helpers.DiskCache import DiskTTLCache
+from src.config.ConfigBase import Config
+
+
+class ScrapeStagingStore:
+    """
+    Scrape payloads fetched while verifying a profile in the Google stage, kept for the
+    LinkedIn and GitHub stages so they do not fetch the same profile again.
+    Entries are keyed by source, candidate and handle and expire after the freshness window.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.cache = DiskTTLCache(path, ttl_seconds, name="scrape_staging")
+
+    @staticmethod
+    def __key(source: str, candidate_id: str, handle: str) -> str:
+        return f"{source.lower()}|{candidate_id}|{handle.strip().lower()}"
+
+    def stage(self, source: str, candidate_id: str, handle: str, payload: Any) -> None:
+        if payload:
+            self.cache.put(self.__key(source, candidate_id, handle), payload)
+
+    def get(self, source: str, candidate_id: str, handle: str) -> Optional[Any]:
+        """The staged payload, None when missing or older than the freshness window"""
+        return self.cache.get(self.__key(source, candidate_id, handle))
+
+    def discard(self, source: str, candidate_id: str, handle: str) -> None:
+        """Drops a payload once its stage has saved it"""
+        self.cache.delete(self.__key(source, candidate_id, handle))
+
+    @classmethod
+    def from_config(cls) -> "ScrapeStagingStore":
+        staging_config = (Config().getConfig().get("profiler") or {}).get("scrape_staging") or {}
+        return cls(staging_config.get("path", "./src/Static/Cache/ScrapeStaging"),
+                   staging_config.get("ttl_minutes", 120) * 60)
+
+
+_store: Optional[ScrapeStagingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_scrape_staging() -> ScrapeStagingStore:
+    """Process-wide staging store shared by the scraping stages"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ScrapeStagingStore.from_config()
+        return _store
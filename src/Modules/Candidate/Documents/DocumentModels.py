@@ -16,12 +16,14 @@ class Document(db.Model):
     stored_name = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     document_type = db.Column(db.String(50), nullable=False)  # e.g., 'resume', 'cover_letter'
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the file content
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Indexes
     __table_args__ = (
         Index('idx_document_candidate_type', 'candidate_id', 'document_type'),
+        Index('idx_document_content_hash', 'content_hash'),
     )
 
     # Relationship
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import shutil
 import uuid
@@ -16,6 +17,15 @@ class DocumentService:
         self.UPLOAD_FOLDER = path
         self.ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 
+    @staticmethod
+    def compute_content_hash(file_path):
+        """SHA-256 of the file content, read in chunks so large files are not loaded at once"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
     def allowed_file(self, filename):
         return '.' in filename and filename.rsplit('.', 1)[1].lower() in self.ALLOWED_EXTENSIONS
 
@@ -38,7 +48,8 @@ class DocumentService:
                 original_name=original_filename,
                 stored_name=stored_filename,
                 file_path=new_file_path,
-                document_type=document_type
+                document_type=document_type,
+                content_hash=self.compute_content_hash(new_file_path)
             )
 
             return self.__document_repository.save_document(document)
@@ -55,6 +66,13 @@ class DocumentService:
         except Exception as e:
             raise CustomError(f"Error fetching resume: {str(e)}", 400)
 
+    def ensure_content_hash(self, document):
+        """Returns the document's content hash, computing and saving it for documents stored before hashing"""
+        if not document.content_hash:
+            document.content_hash = self.compute_content_hash(document.file_path)
+            self.__document_repository.update_document(document)
+        return document.content_hash
+
     def update_document_status(self, document_id, new_status):
         """Update document processing status"""
         try:
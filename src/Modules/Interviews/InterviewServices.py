@@ -5,6 +5,7 @@ from typing import List, Dict, Any, TypedDict, Optional
 from marshmallow import Schema, fields, validates, ValidationError
 from src.Helpers.ErrorHandling import CustomError
 from src.Helpers.LLMService import LLMService
+from src.Modules.LLMUsage.LLMUsageService import llm_usage_scope
 from src.Modules.Interviews.InterviewDTOs import InterviewScheduleDTO
 from src.Modules.Interviews.InterviewModels import InterviewSchedule, InterviewStatus
 from src.Modules.Notification.NotificationService import NotificationService, NotificationType
@@ -354,7 +355,8 @@ class InterviewSchedulerService:
             """
 
             # Get schedule from LLM
-            schedule_response = self.__llm_service.create_interview_schedule(schedule_prompt)
+            with llm_usage_scope(stage="interview_scheduling"):
+                schedule_response = self.__llm_service.create_interview_schedule(schedule_prompt)
 
             if not schedule_response['constraints_satisfied']:
                 raise CustomError("Could not create schedule satisfying all constraints", 400)
@@ -566,7 +568,9 @@ class InterviewSchedulerService:
                                 """
 
                 print("Prompt created successfully")
-                email_response = self.__llm_service.generate_notification_email(email_prompt)
+                with llm_usage_scope(stage="interview_scheduling", candidate_id=candidate["id"],
+                                     job_id=candidate.get("jobId")):
+                    email_response = self.__llm_service.generate_notification_email(email_prompt)
 
                 print("This is my email response: {}".format(email_response))
 
@@ -668,7 +672,9 @@ class InterviewSchedulerService:
                 """
 
                 print("Creating rejection email prompt...")
-                email_response = self.__llm_service.generate_notification_email(email_prompt)
+                with llm_usage_scope(stage="interview_scheduling", candidate_id=candidate["id"],
+                                     job_id=candidate.get("jobId")):
+                    email_response = self.__llm_service.generate_notification_email(email_prompt)
 
                 print("Email response received:", email_response)
 
@@ -0,0 +1,33 @@
+from marshmallow import fields
+from src.Helpers.Utils import CamelCaseSchema
+
+
+class LLMUsageRecordDTO(CamelCaseSchema):
+    id = fields.Str(dump_only=True)
+    task = fields.Str(dump_only=True)
+    model = fields.Str(dump_only=True)
+    stage = fields.Str(dump_only=True)
+    candidate_id = fields.Str(dump_only=True)
+    job_id = fields.Str(dump_only=True)
+    input_tokens = fields.Int(dump_only=True)
+    output_tokens = fields.Int(dump_only=True)
+    cached_input_tokens = fields.Int(dump_only=True)
+    latency_ms = fields.Float(dump_only=True)
+    retry_count = fields.Int(dump_only=True)
+    cost_usd = fields.Float(dump_only=True)
+    success = fields.Bool(dump_only=True)
+    error = fields.Str(dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+
+
+class LLMUsageAggregateDTO(CamelCaseSchema):
+    key = fields.Str(dump_only=True)
+    calls = fields.Int(dump_only=True)
+    failed_calls = fields.Int(dump_only=True)
+    input_tokens = fields.Int(dump_only=True)
+    output_tokens = fields.Int(dump_only=True)
+    cached_input_tokens = fields.Int(dump_only=True)
+    total_latency_ms = fields.Float(dump_only=True)
+    avg_latency_ms = fields.Float(dump_only=True)
+    retries = fields.Int(dump_only=True)
+    cost_usd = fields.Float(dump_only=True)
@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Index
+from src.config.DBModelsConfig import db
+
+
+class LLMUsageRecord(db.Model):
+    __tablename__ = 'llm_usage_records'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    task = db.Column(db.String(64), nullable=False)
+    model = db.Column(db.String(64), nullable=False)
+    stage = db.Column(db.String(64), nullable=True)  # pipeline name, or None outside the pipelines
+    candidate_id = db.Column(db.String(36), nullable=True)
+    job_id = db.Column(db.String(36), nullable=True)
+
+    input_tokens = db.Column(db.Integer, nullable=False, default=0)
+    output_tokens = db.Column(db.Integer, nullable=False, default=0)
+    cached_input_tokens = db.Column(db.Integer, nullable=False, default=0)  # input served from a prompt cache
+    latency_ms = db.Column(db.Float, nullable=False, default=0.0)  # wall time including retries
+    retry_count = db.Column(db.Integer, nullable=False, default=0)
+    cost_usd = db.Column(db.Float, nullable=False, default=0.0)
+    success = db.Column(db.Boolean, nullable=False, default=True)
+    error = db.Column(db.String(255), nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_llm_usage_candidate', 'candidate_id'),
+        Index('idx_llm_usage_job', 'job_id'),
+        Index('idx_llm_usage_created_at', 'created_at'),
+    )
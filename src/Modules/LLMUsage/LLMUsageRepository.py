@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import List, Optional, Any
+
+from sqlalchemy import func, case
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.Helpers.BaseRepository import BaseRepository
+from src.Modules.LLMUsage.LLMUsageModels import LLMUsageRecord
+
+
+class LLMUsageRepository(BaseRepository[LLMUsageRecord]):
+    def __init__(self):
+        super().__init__(LLMUsageRecord)
+
+    def record(self, entity: LLMUsageRecord) -> LLMUsageRecord:
+        """
+        Persist a usage record in its own session, so the caller's pending changes are never committed with it
+        """
+        with Session(self._db.engine, expire_on_commit=False) as session:
+            try:
+                session.add(entity)
+                session.commit()
+                return entity
+            except SQLAlchemyError as e:
+                session.rollback()
+                raise e
+
+    def get_by_candidate_id(self, candidate_id: str) -> List[LLMUsageRecord]:
+        try:
+            return (self._db.session.query(LLMUsageRecord)
+                    .filter_by(candidate_id=candidate_id)
+                    .order_by(LLMUsageRecord.created_at)
+                    .all())
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
+
+    def aggregate_by(self, group_column: Any, since: Optional[datetime] = None) -> List[Any]:
+        """
+        Sum tokens, latency, retries and cost grouped by the given column or expression
+        """
+        try:
+            key = group_column.label('key')
+            query = self._db.session.query(
+                key,
+                func.count(LLMUsageRecord.id).label('calls'),
+                func.sum(case((LLMUsageRecord.success.is_(False), 1), else_=0)).label('failed_calls'),
+                func.sum(LLMUsageRecord.input_tokens).label('input_tokens'),
+                func.sum(LLMUsageRecord.output_tokens).label('output_tokens'),
+                func.sum(LLMUsageRecord.cached_input_tokens).label('cached_input_tokens'),
+                func.sum(LLMUsageRecord.latency_ms).label('total_latency_ms'),
+                func.avg(LLMUsageRecord.latency_ms).label('avg_latency_ms'),
+                func.sum(LLMUsageRecord.retry_count).label('retries'),
+                func.sum(LLMUsageRecord.cost_usd).label('cost_usd'),
+            )
+            if since:
+                query = query.filter(LLMUsageRecord.created_at >= since)
+
+            return query.group_by(key).order_by(key).all()
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
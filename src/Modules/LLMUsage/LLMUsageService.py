@@ -0,0 +1,112 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List
+
+from sqlalchemy import func
+
+from src.Helpers.ErrorHandling import CustomError
+from src.Modules.LLMUsage.LLMUsageDTOs import LLMUsageRecordDTO, LLMUsageAggregateDTO
+from src.Modules.LLMUsage.LLMUsageModels import LLMUsageRecord
+from src.Modules.LLMUsage.LLMUsageRepository import LLMUsageRepository
+from src.config.ConfigBase import Config
+
+# Stage, candidate and job of the LLM calls made on the current thread
+_usage_context = threading.local()
+
+
+@contextmanager
+def llm_usage_scope(**fields):
+    """
+    Attributes every LLM call made inside the block to the given stage, candidate_id and/or job_id.
+    Scopes nest, inner values override outer ones.
+    """
+    previous = getattr(_usage_context, "fields", {})
+    _usage_context.fields = {**previous, **{k: v for k, v in fields.items() if v is not None}}
+    try:
+        yield
+    finally:
+        _usage_context.fields = previous
+
+
+def current_usage_scope() -> Dict[str, Any]:
+    return dict(getattr(_usage_context, "fields", {}))
+
+
+class LLMUsageService:
+    def __init__(self):
+        self.__usage_repository = LLMUsageRepository()
+        self.__config = Config()
+
+    def __calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        pricing = (self.__config.getConfig().get("llm", {}).get("pricing") or {}).get(model) or {}
+        return (input_tokens * pricing.get("input_per_million", 0.0) +
+                output_tokens * pricing.get("output_per_million", 0.0)) / 1_000_000
+
+    def record_call(self, task: str, model: str, input_tokens: int, output_tokens: int, latency_ms: float,
+                    retry_count: int, success: bool = True, error: Optional[str] = None,
+                    cached_input_tokens: int = 0) -> None:
+        """
+        Records one LLM call against the current usage scope.
+        Accounting must never break the call it measures, so failures are only logged.
+        """
+        try:
+            scope = current_usage_scope()
+            record = LLMUsageRecord(
+                task=task,
+                model=model,
+                stage=scope.get("stage"),
+                candidate_id=scope.get("candidate_id"),
+                job_id=scope.get("job_id"),
+                input_tokens=input_tokens or 0,
+                output_tokens=output_tokens or 0,
+                cached_input_tokens=cached_input_tokens or 0,
+                latency_ms=latency_ms,
+                retry_count=retry_count,
+                cost_usd=self.__calculate_cost(model, input_tokens or 0, output_tokens or 0),
+                success=success,
+                error=error[:255] if error else None
+            )
+            self.__usage_repository.record(record)
+        except Exception as e:
+            print(f"Failed to record LLM usage for task {task}: {str(e)}")
+
+    def __aggregate(self, group_column, days: Optional[int]) -> List[Dict[str, Any]]:
+        try:
+            since = datetime.utcnow() - timedelta(days=days) if days else None
+            rows = self.__usage_repository.aggregate_by(group_column, since)
+            return LLMUsageAggregateDTO(many=True).dump([row._asdict() for row in rows])
+        except Exception as e:
+            raise CustomError(f"Failed to aggregate LLM usage: {str(e)}", 400)
+
+    def get_usage_by_stage(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.__aggregate(LLMUsageRecord.stage, days)
+
+    def get_usage_by_task(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.__aggregate(LLMUsageRecord.task, days)
+
+    def get_usage_by_task_and_model(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Usage per task and model, e.g. `email_extraction:gemini-1.5-flash-8b`, to compare routes and fallbacks"""
+        return self.__aggregate(LLMUsageRecord.task + ':' + LLMUsageRecord.model, days)
+
+    def get_usage_by_job(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.__aggregate(LLMUsageRecord.job_id, days)
+
+    def get_usage_by_day(self, days: Optional[int] = 30) -> List[Dict[str, Any]]:
+        return self.__aggregate(func.date(LLMUsageRecord.created_at), days)
+
+    def get_usage_for_candidate(self, candidate_id: str) -> Dict[str, Any]:
+        try:
+            records = self.__usage_repository.get_by_candidate_id(candidate_id)
+            return {
+                "candidateId": candidate_id,
+                "calls": len(records),
+                "inputTokens": sum(r.input_tokens for r in records),
+                "outputTokens": sum(r.output_tokens for r in records),
+                "cachedInputTokens": sum(r.cached_input_tokens or 0 for r in records),
+                "latencyMs": sum(r.latency_ms for r in records),
+                "costUsd": sum(r.cost_usd for r in records),
+                "records": LLMUsageRecordDTO(many=True).dump(records)
+            }
+        except Exception as e:
+            raise CustomError(f"Failed to fetch LLM usage for candidate: {str(e)}", 400)
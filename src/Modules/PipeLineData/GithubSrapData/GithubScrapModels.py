@@ -33,9 +33,11 @@ class GitHubProfile(db.Model):
     dates = db.Column(db.JSON, nullable=True)
     urls = db.Column(db.JSON, nullable=True)
     additional_info = db.Column(db.JSON, nullable=True)
+    # When the profile was last scraped, decides when a refresh is due
+    last_scraped_at = db.Column(db.DateTime, nullable=True)
 
     # Relationships
-    repositories = db.relationship('GithubRepository', backref='profile', lazy=True)
+    repositories = db.relationship('GithubRepository', backref='profile', lazy=True, cascade='all, delete-orphan')
 
 class GithubRepository(db.Model):
     __tablename__ = 'github_repositories'
@@ -1,4 +1,6 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Dict
+from sqlalchemy import func, insert, update, delete
 from sqlalchemy.exc import SQLAlchemyError
 from src.Helpers.BaseRepository import BaseRepository
 from src.Modules.PipeLineData.GithubSrapData.GithubScrapModels import GitHubProfile, GithubRepository
@@ -14,6 +16,36 @@ class GitHubProfileRepository(BaseRepository[GitHubProfile]):
             self._db.session.rollback()
             raise e
 
+    def get_by_username(self, username: str) -> Optional[GitHubProfile]:
+        try:
+            return self._db.session.query(self._model).filter(
+                func.lower(self._model.username) == username.lower()).first()
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
+
+    def save_with_repositories(self, profile: GitHubProfile, new_repositories: List[dict],
+                               updated_repositories: List[dict], removed_repository_ids: List[str]) -> GitHubProfile:
+        """
+        Writes the profile and its repository changes in one transaction,
+        with one bulk INSERT, UPDATE (rows carry their id) and DELETE for the repositories
+        """
+        try:
+            self._db.session.add(profile)
+            self._db.session.flush()
+            if new_repositories:
+                self._db.session.execute(insert(GithubRepository),
+                                         [{**row, 'github_profile_id': profile.id} for row in new_repositories])
+            if updated_repositories:
+                self._db.session.execute(update(GithubRepository), updated_repositories)
+            if removed_repository_ids:
+                self._db.session.execute(delete(GithubRepository).where(GithubRepository.id.in_(removed_repository_ids)))
+            self._db.session.commit()
+            return profile
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
+
 class GithubRepositoryRepository(BaseRepository[GithubRepository]):
     def __init__(self):
         super().__init__(GithubRepository)
@@ -23,4 +55,22 @@ class GithubRepositoryRepository(BaseRepository[GithubRepository]):
             return self._db.session.query(self._model).filter_by(github_profile_id=profile_id).all()
         except SQLAlchemyError as e:
             self._db.session.rollback()
-            raise e
\ No newline at end of file
+            raise e
+
+    def get_ids_by_profile_id(self, profile_id: str) -> Dict[str, str]:
+        """Repository ids by full_name, without loading the rows"""
+        try:
+            return dict(self._db.session.query(self._model.full_name, self._model.id)
+                        .filter_by(github_profile_id=profile_id).all())
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
+
+    def get_pushed_at_by_profile_id(self, profile_id: str) -> Dict[str, datetime]:
+        """Repository pushed_at by full_name, without loading the rows"""
+        try:
+            return dict(self._db.session.query(self._model.full_name, self._model.pushed_at)
+                        .filter_by(github_profile_id=profile_id).all())
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
@@ -1,20 +1,78 @@
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Tuple, List
 from src.Helpers.ErrorHandling import CustomError
 from src.Modules.PipeLineData.GithubSrapData.GithubScrapDTOs import GitHubProfileDTO, GithubRepositoryDTO
 from src.Modules.PipeLineData.GithubSrapData.GithubScrapModels import GitHubProfile, GithubRepository
 from src.Modules.PipeLineData.GithubSrapData.GithubScrapRepository import GitHubProfileRepository, GithubRepositoryRepository
+from src.Modules.PipeLineData.GoogleScrapData.GoogleScrapRepository import CandidateProfessionalHandleRepository
+from src.config.ConfigBase import Config
+
+# GitHub's timestamp format, stored pushed_at values are formatted back to it to compare with the scraper's strings
+GITHUB_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def parse_github_dates(values: List[Optional[str]]) -> List[Optional[datetime]]:
+    """
+    Parses GitHub's UTC timestamps (2024-01-31T12:00:00Z) in one pass, as naive UTC datetimes.
+    fromisoformat is implemented in C and much cheaper than strptime per value.
+    """
+    return [datetime.fromisoformat(value.rstrip('Z')) if value else None for value in values]
 
 class GitHubScrapDataService:
     def __init__(self):
         self.__githubProfileRepository = GitHubProfileRepository()
         self.__githubRepositoryRepository = GithubRepositoryRepository()
+        self.__handleRepository = CandidateProfessionalHandleRepository()
+
+    @staticmethod
+    def __repository_rows(repositories: List[dict]) -> List[dict]:
+        """Column values of a GithubRepository per scraped repo, with every date parsed in one pass"""
+        date_keys = ('created_at', 'updated_at', 'pushed_at')
+        dates = iter(parse_github_dates([repo['dates'][key] for repo in repositories for key in date_keys]))
+        rows = []
+        for repo_data in repositories:
+            created_at, updated_at, pushed_at = next(dates), next(dates), next(dates)
+            rows.append({
+                'name': repo_data['name'],
+                'full_name': repo_data['full_name'],
+                'description': repo_data['description'],
+                'homepage': repo_data['homepage'],
+                'language': repo_data['language'],
+                'stars': repo_data['stats']['stars'],
+                'watchers': repo_data['stats']['watchers'],
+                'forks': repo_data['stats']['forks'],
+                'open_issues': repo_data['stats']['open_issues'],
+                'size': repo_data['stats']['size'],
+                'created_at': created_at,
+                'updated_at': updated_at,
+                'pushed_at': pushed_at,
+                'is_fork': repo_data['features']['fork'],
+                'languages_breakdown': repo_data['languages_breakdown'],
+                'stats': repo_data['stats'],
+                'dates': repo_data['dates'],
+                'urls': repo_data['urls'],
+                'features': repo_data['features'],
+                'branch': repo_data['branch'],
+                'license': repo_data['license'],
+                'latest_commits': repo_data['latest_commits'],
+                'top_contributors': repo_data['top_contributors']
+            })
+        return rows
 
-    def save_profile(self,candidate_id, github_info):
+    def save_profile(self, candidate_id, github_info):
+        """
+        Inserts the profile or, when the GitHub user is already stored, updates it in place.
+        A stored profile keeps the candidate it was first saved for, later candidates with the
+        same GitHub handle read it through their handle (see get_profile_by_candidate_id).
+        On update:
+        repos marked unchanged by the scraper are left alone, the others are updated or added,
+        and stored repos missing from the scrape are deleted. Repos are written with bulk
+        statements and everything is committed at once.
+        """
         try:
             # Convert date strings to datetime objects
-            created_at = datetime.strptime(github_info['dates']['created_at'], '%Y-%m-%dT%H:%M:%SZ')
-            updated_at = datetime.strptime(github_info['dates']['updated_at'], '%Y-%m-%dT%H:%M:%SZ')
+            created_at, updated_at = parse_github_dates([github_info['dates']['created_at'],
+                                                         github_info['dates']['updated_at']])
 
             profile_data = {
                 'candidate_id': candidate_id,
@@ -39,46 +97,52 @@ class GitHubScrapDataService:
                 'stats': github_info['stats'],
                 'dates': github_info['dates'],
                 'urls': github_info['urls'],
-                'additional_info': github_info['additional_info']
+                'additional_info': github_info['additional_info'],
+                'last_scraped_at': datetime.utcnow()
             }
-            profile = GitHubProfile(**profile_data)
-            saved_profile = self.__githubProfileRepository.create(profile)
-
-            for repo_data in github_info['repositories']:
-                # Convert date strings to datetime objects for repository data
-                created_at = datetime.strptime(repo_data['dates']['created_at'], '%Y-%m-%dT%H:%M:%SZ')
-                updated_at = datetime.strptime(repo_data['dates']['updated_at'], '%Y-%m-%dT%H:%M:%SZ')
-                pushed_at = datetime.strptime(repo_data['dates']['pushed_at'], '%Y-%m-%dT%H:%M:%SZ')
-
-                repo = GithubRepository(
-                    github_profile_id=saved_profile.id,
-                    name=repo_data['name'],
-                    full_name=repo_data['full_name'],
-                    description=repo_data['description'],
-                    homepage=repo_data['homepage'],
-                    language=repo_data['language'],
-                    stars=repo_data['stats']['stars'],
-                    watchers=repo_data['stats']['watchers'],
-                    forks=repo_data['stats']['forks'],
-                    open_issues=repo_data['stats']['open_issues'],
-                    size=repo_data['stats']['size'],
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    pushed_at=pushed_at,
-                    is_fork=repo_data['features']['fork'],
-                    languages_breakdown=repo_data['languages_breakdown'],
-                    stats=repo_data['stats'],
-                    dates=repo_data['dates'],
-                    urls=repo_data['urls'],
-                    features=repo_data['features'],
-                    branch=repo_data['branch'],
-                    license=repo_data['license'],
-                    latest_commits=repo_data['latest_commits'],
-                    top_contributors=repo_data['top_contributors']
-                )
-                self.__githubRepositoryRepository.create(repo)
-
-            return GitHubProfileDTO().dump(saved_profile)
+
+            profile = self.__githubProfileRepository.get_by_username(profile_data['username'])
+            is_new = profile is None
+            if is_new:
+                profile = GitHubProfile()
+            else:
+                del profile_data['candidate_id']
+            for key, value in profile_data.items():
+                setattr(profile, key, value)
+
+            stored_ids = {} if is_new else self.__githubRepositoryRepository.get_ids_by_profile_id(profile.id)
+            changed = [repo for repo in github_info['repositories'] if not repo.get('unchanged')]
+            new_rows, updated_rows = [], []
+            for row in self.__repository_rows(changed):
+                if row['full_name'] in stored_ids:
+                    updated_rows.append({'id': stored_ids[row['full_name']], **row})
+                else:
+                    new_rows.append(row)
+            scraped = {repo['full_name'] for repo in github_info['repositories']}
+            removed_ids = [repo_id for full_name, repo_id in stored_ids.items() if full_name not in scraped]
+
+            self.__githubProfileRepository.save_with_repositories(profile, new_rows, updated_rows, removed_ids)
+            return GitHubProfileDTO().dump(profile)
+        except Exception as e:
+            raise CustomError(str(e), 400)
+
+    def get_refresh_state(self, username: str) -> Tuple[bool, Dict[str, str]]:
+        """
+        Whether the user's stored profile is missing or older than the refresh TTL, and the pushed_at
+        of its stored repos by full_name, so a refresh only re-fetches repos pushed to since
+        """
+        try:
+            profile = self.__githubProfileRepository.get_by_username(username)
+            if profile is None:
+                return True, {}
+
+            ttl_days = ((Config().getConfig().get("profiler") or {}).get("github") or {}).get("refresh_ttl_days", 7)
+            due = (profile.last_scraped_at is None or
+                   datetime.utcnow() - profile.last_scraped_at >= timedelta(days=ttl_days))
+            stored_pushed_at = self.__githubRepositoryRepository.get_pushed_at_by_profile_id(profile.id)
+            known_pushed_at = {full_name: pushed_at.strftime(GITHUB_DATE_FORMAT)
+                               for full_name, pushed_at in stored_pushed_at.items() if pushed_at}
+            return due, known_pushed_at
         except Exception as e:
             raise CustomError(str(e), 400)
 
@@ -86,6 +150,11 @@ class GitHubScrapDataService:
         try:
             print("Inside get_profile_by_candidate_id github::", candidate_id)
             profile = self.__githubProfileRepository.get_by_candidate_id(candidate_id)
+            if not profile:
+                # A profile shared with an earlier candidate stays theirs, find it through this candidate's handle
+                handle = self.__handleRepository.getGitHubHandleByCandidateId(candidate_id)
+                if handle and handle.handle:
+                    profile = self.__githubProfileRepository.get_by_username(handle.handle)
             print("My github profile id is: ", profile)
             if not profile:
                 return None
@@ -1,3 +1,6 @@
+from typing import List, Optional
+from sqlalchemy import insert, delete
+from sqlalchemy.exc import SQLAlchemyError
 from src.Helpers.BaseRepository import BaseRepository
 from src.Modules.PipeLineData.LinkedInScrapData.LinkedInScrapModels import LinkedInProfile, LinkedInWorkExperience, LinkedInEducation
 
@@ -8,6 +11,33 @@ class LinkedInProfileRepository(BaseRepository[LinkedInProfile]):
     def get_by_candidate_id(self, candidate_id: str) -> LinkedInProfile:
         return self._db.session.query(self._model).filter_by(candidate_id=candidate_id).first()
 
+    def get_by_candidate_id_and_username(self, candidate_id: str, username: str) -> Optional[LinkedInProfile]:
+        try:
+            return self._db.session.query(self._model).filter_by(candidate_id=candidate_id, username=username).first()
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
+
+    def save_with_details(self, profile: LinkedInProfile, experience: List[dict],
+                          education: List[dict]) -> LinkedInProfile:
+        """
+        Writes the profile and replaces its experience and education rows in one transaction,
+        with one bulk DELETE and INSERT per table
+        """
+        try:
+            self._db.session.add(profile)
+            self._db.session.flush()
+            for model, rows in ((LinkedInWorkExperience, experience), (LinkedInEducation, education)):
+                self._db.session.execute(delete(model).where(model.linked_in_profile_id == profile.id))
+                if rows:
+                    self._db.session.execute(insert(model),
+                                             [{**row, 'linked_in_profile_id': profile.id} for row in rows])
+            self._db.session.commit()
+            return profile
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
+
 class LinkedInWorkExperienceRepository(BaseRepository[LinkedInWorkExperience]):
     def __init__(self):
         super().__init__(LinkedInWorkExperience)
@@ -2,52 +2,44 @@ from typing import Optional
 
 from src.Helpers.ErrorHandling import CustomError
 from src.Modules.PipeLineData.LinkedInScrapData.LinkedInScrapDTOs import LinkedInProfileDTO, LinkedInWorkExperienceDTO, LinkedInEducationDTO
-from src.Modules.PipeLineData.LinkedInScrapData.LinkedInScrapModels import LinkedInProfile, LinkedInWorkExperience, LinkedInEducation
-from src.Modules.PipeLineData.LinkedInScrapData.LinkedInScrapRepository import LinkedInProfileRepository, LinkedInWorkExperienceRepository, LinkedInEducationRepository
+from src.Modules.PipeLineData.LinkedInScrapData.LinkedInScrapModels import LinkedInProfile
+from src.Modules.PipeLineData.LinkedInScrapData.LinkedInScrapRepository import LinkedInProfileRepository
 
 class LinkedInScrapDataService:
     def __init__(self):
         self.__linkedInProfileRepository = LinkedInProfileRepository()
-        self.__linkedInWorkExperienceRepository = LinkedInWorkExperienceRepository()
-        self.__linkedInEducationRepository = LinkedInEducationRepository()
 
     def save_profile(self,candidate_id, profile_data):
+        """
+        Saves the profile with its experience, education and skills in one transaction.
+        A profile already stored for the candidate and username is refreshed in place.
+        """
         try:
-            print("the data : ", profile_data)
-            profile = LinkedInProfile(
-                candidate_id=candidate_id,
-                username=profile_data['basic_info']['username'],
-                full_name=profile_data['basic_info']['full_name'],
-                headline=profile_data['basic_info']['headline'],
-                location=profile_data['basic_info']['location'],
-                summary=profile_data['basic_info']['summary']
-            )
-            saved_profile = self.__linkedInProfileRepository.create(profile)
-
-            for exp_data in profile_data['experience']:
-                experience = LinkedInWorkExperience(
-                    linked_in_profile_id=saved_profile.id,
-                    company=exp_data['company'],
-                    title=exp_data['title'],
-                    location=exp_data['location'],
-                    duration=exp_data['duration'],
-                    description=exp_data['description']
-                )
-                self.__linkedInWorkExperienceRepository.create(experience)
-
-            for edu_data in profile_data['education']:
-                education = LinkedInEducation(
-                    linked_in_profile_id=saved_profile.id,
-                    school=edu_data['school'],
-                    degree=edu_data['degree'],
-                    field=edu_data['field'],
-                    years=edu_data['years']
-                )
-                self.__linkedInEducationRepository.create(education)
-
-            saved_profile.skills = profile_data['skills']
-            self.__linkedInProfileRepository.update(saved_profile)
-
+            basic_info = profile_data['basic_info']
+            profile = (self.__linkedInProfileRepository.get_by_candidate_id_and_username(candidate_id,
+                                                                                        basic_info['username'])
+                       or LinkedInProfile(candidate_id=candidate_id, username=basic_info['username']))
+            profile.full_name = basic_info['full_name']
+            profile.headline = basic_info['headline']
+            profile.location = basic_info['location']
+            profile.summary = basic_info['summary']
+            profile.skills = profile_data['skills']
+
+            experience = [{
+                'company': exp_data['company'],
+                'title': exp_data['title'],
+                'location': exp_data['location'],
+                'duration': exp_data['duration'],
+                'description': exp_data['description']
+            } for exp_data in profile_data['experience']]
+            education = [{
+                'school': edu_data['school'],
+                'degree': edu_data['degree'],
+                'field': edu_data['field'],
+                'years': edu_data['years']
+            } for edu_data in profile_data['education']]
+
+            saved_profile = self.__linkedInProfileRepository.save_with_details(profile, experience, education)
             return LinkedInProfileDTO().dump(saved_profile)
         except Exception as e:
             raise CustomError(str(e), 400)
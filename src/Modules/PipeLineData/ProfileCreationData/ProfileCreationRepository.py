@@ -1,4 +1,5 @@
 from typing import Optional, List
+from sqlalchemy.orm import selectinload
 from src.Helpers.BaseRepository import BaseRepository
 from src.Modules.PipeLineData.ProfileCreationData.ProfileCreationModels import (
     CandidateProfile,
@@ -26,6 +27,31 @@ class CandidateProfileRepository(BaseRepository[CandidateProfile]):
     def get_by_candidate_id(self, candidate_id: str) -> Optional[CandidateProfile]:
         return self._model.query.filter_by(candidate_id=candidate_id).first()
 
+    @staticmethod
+    def __tree_options():
+        """Loads every match with all its sections and their rows, one query per table for any number of profiles"""
+        matches = selectinload(CandidateProfile.matches)
+        return (
+            matches.selectinload(CandidateProfileMatch.technical_skills).options(
+                selectinload(CandidateProfileTechnicalSkills.skill_matches),
+                selectinload(CandidateProfileTechnicalSkills.frameworks)),
+            matches.selectinload(CandidateProfileMatch.soft_skills).selectinload(
+                CandidateProfileSoftSkills.skill_matches),
+            matches.selectinload(CandidateProfileMatch.experience).options(
+                selectinload(CandidateProfileExperience.industry_experiences),
+                selectinload(CandidateProfileExperience.relevant_roles)),
+            matches.selectinload(CandidateProfileMatch.education).selectinload(CandidateProfileEducation.degrees),
+            matches.selectinload(CandidateProfileMatch.projects).selectinload(
+                CandidateProfileProjectsAndAchievements.items),
+            matches.selectinload(CandidateProfileMatch.social_presence)
+        )
+
+    def get_tree_by_candidate_id(self, candidate_id: str) -> Optional[CandidateProfile]:
+        return self._model.query.options(*self.__tree_options()).filter_by(candidate_id=candidate_id).first()
+
+    def get_all_trees(self) -> List[CandidateProfile]:
+        return self._model.query.options(*self.__tree_options()).all()
+
 
 class CandidateProfileMatchRepository(BaseRepository[CandidateProfileMatch]):
     def __init__(self):
@@ -194,81 +194,71 @@ class CandidateProfileDataService:
 
    def get_profile_by_candidate_id(self, candidate_id: str) -> Optional[dict]:
        try:
-           profile = self.__profileRepo.get_by_candidate_id(candidate_id)
+           profile = self.__profileRepo.get_tree_by_candidate_id(candidate_id)
            if not profile:
                return None
-
-           profile_dto = CandidateProfileDTO().dump(profile)
-           matches = self.__matchRepo.get_by_profile_id(profile.id)
-           matches_data = []
-
-           for match in matches:
-               match_dto = CandidateProfileMatchDTO().dump(match)
-
-               # Get Technical Skills
-               tech_skills = self.__technicalSkillsRepo.get_by_match_id(match.id)
-               if tech_skills:
-                   tech_dto = CandidateProfileTechnicalSkillsDTO().dump(tech_skills)
-                   tech_dto['skillMatches'] = CandidateProfileTechnicalSkillMatchDTO(many=True).dump(
-                       self.__technicalSkillMatchRepo.get_by_technical_skills_id(tech_skills.id)
-                   )
-                   tech_dto['frameworksAndTools'] = CandidateProfileFrameworkToolDTO(many=True).dump(
-                       self.__frameworkToolRepo.get_by_technical_skills_id(tech_skills.id)
-                   )
-                   match_dto['technicalSkills'] = tech_dto
-
-               # Get Soft Skills
-               soft_skills = self.__softSkillsRepo.get_by_match_id(match.id)
-               if soft_skills:
-                   soft_dto = CandidateProfileSoftSkillsDTO().dump(soft_skills)
-                   soft_dto['skillMatches'] = CandidateProfileSoftSkillMatchDTO(many=True).dump(
-                       self.__softSkillMatchRepo.get_by_soft_skills_id(soft_skills.id)
-                   )
-                   match_dto['softSkills'] = soft_dto
-
-               # Get Experience
-               experience = self.__experienceRepo.get_by_match_id(match.id)
-               if experience:
-                   exp_dto = CandidateProfileExperienceDTO().dump(experience)
-                   exp_dto['industryExperience'] = CandidateProfileIndustryExperienceDTO(many=True).dump(
-                       self.__industryExpRepo.get_by_experience_id(experience.id)
-                   )
-                   exp_dto['relevantRoles'] = CandidateProfileRelevantRoleDTO(many=True).dump(
-                       self.__relevantRoleRepo.get_by_experience_id(experience.id)
-                   )
-                   match_dto['experience'] = exp_dto
-
-               # Get Education
-               education = self.__educationRepo.get_by_match_id(match.id)
-               if education:
-                   edu_dto = CandidateProfileEducationDTO().dump(education)
-                   edu_dto['degrees'] = CandidateProfileDegreeDTO(many=True).dump(
-                       self.__degreeRepo.get_by_education_id(education.id)
-                   )
-                   match_dto['education'] = edu_dto
-
-               # Get Projects
-               projects = self.__projectsRepo.get_by_match_id(match.id)
-               if projects:
-                   proj_dto = CandidateProfileProjectsDTO().dump(projects)
-                   proj_dto['items'] = CandidateProfileProjectDTO(many=True).dump(
-                       self.__projectRepo.get_by_projects_id(projects.id)
-                   )
-                   match_dto['projects'] = proj_dto
-
-               # Get Social Presence
-               social = self.__socialPresenceRepo.get_by_match_id(match.id)
-               if social:
-                   match_dto['socialPresence'] = CandidateProfileSocialPresenceDTO().dump(social)
-
-               matches_data.append(match_dto)
-
-           profile_dto['matches'] = matches_data
-           return profile_dto
+           return self.__dump_profile(profile)
 
        except Exception as e:
            raise CustomError(str(e), 400)
 
+   @staticmethod
+   def __dump_profile(profile: CandidateProfile) -> dict:
+       """Serialises a profile whose tree was eager-loaded, without further queries"""
+       profile_dto = CandidateProfileDTO().dump(profile)
+       matches_data = []
+
+       for match in profile.matches:
+           match_dto = CandidateProfileMatchDTO().dump(match)
+
+           # Technical Skills
+           tech_skills = match.technical_skills
+           if tech_skills:
+               tech_dto = CandidateProfileTechnicalSkillsDTO().dump(tech_skills)
+               tech_dto['skillMatches'] = CandidateProfileTechnicalSkillMatchDTO(many=True).dump(tech_skills.skill_matches)
+               tech_dto['frameworksAndTools'] = CandidateProfileFrameworkToolDTO(many=True).dump(tech_skills.frameworks)
+               match_dto['technicalSkills'] = tech_dto
+
+           # Soft Skills
+           soft_skills = match.soft_skills
+           if soft_skills:
+               soft_dto = CandidateProfileSoftSkillsDTO().dump(soft_skills)
+               soft_dto['skillMatches'] = CandidateProfileSoftSkillMatchDTO(many=True).dump(soft_skills.skill_matches)
+               match_dto['softSkills'] = soft_dto
+
+           # Experience
+           experience = match.experience
+           if experience:
+               exp_dto = CandidateProfileExperienceDTO().dump(experience)
+               exp_dto['industryExperience'] = CandidateProfileIndustryExperienceDTO(many=True).dump(
+                   experience.industry_experiences
+               )
+               exp_dto['relevantRoles'] = CandidateProfileRelevantRoleDTO(many=True).dump(experience.relevant_roles)
+               match_dto['experience'] = exp_dto
+
+           # Education
+           education = match.education
+           if education:
+               edu_dto = CandidateProfileEducationDTO().dump(education)
+               edu_dto['degrees'] = CandidateProfileDegreeDTO(many=True).dump(education.degrees)
+               match_dto['education'] = edu_dto
+
+           # Projects
+           projects = match.projects
+           if projects:
+               proj_dto = CandidateProfileProjectsDTO().dump(projects)
+               proj_dto['items'] = CandidateProfileProjectDTO(many=True).dump(projects.items)
+               match_dto['projects'] = proj_dto
+
+           # Social Presence
+           if match.social_presence:
+               match_dto['socialPresence'] = CandidateProfileSocialPresenceDTO().dump(match.social_presence)
+
+           matches_data.append(match_dto)
+
+       profile_dto['matches'] = matches_data
+       return profile_dto
+
    def update_profile(self, profile_id: str, updated_data: dict) -> Optional[dict]:
        try:
            profile = self.__profileRepo.get_by_id(profile_id)
@@ -349,8 +339,7 @@ class CandidateProfileDataService:
 
    def get_all_profiles(self) -> List[dict]:
        try:
-           profiles = self.__profileRepo.get_all()
-           return [self.get_profile_by_candidate_id(profile.candidate_id)
-                  for profile in profiles if profile]
+           # Same queries whatever the number of profiles, each profile tree is serialised from memory
+           return [self.__dump_profile(profile) for profile in self.__profileRepo.get_all_trees() if profile]
        except Exception as e:
            raise CustomError(str(e), 400)
\ No newline at end of file
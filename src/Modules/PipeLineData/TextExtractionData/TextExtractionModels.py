@@ -17,11 +17,14 @@ class Resume(db.Model):
     __tablename__ = 'resumes'
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    candidate_id = db.Column(db.String(36), db.ForeignKey('candidates.id'), nullable=False)
+    # One resume per candidate, the same person applying to several jobs has one resume per application
+    candidate_id = db.Column(db.String(36), db.ForeignKey('candidates.id'), nullable=False, unique=True)
+    # The document the resume was extracted from, identical documents reuse its extraction
+    document_id = db.Column(db.String(36), db.ForeignKey('documents.id'), nullable=True, index=True)
 
     # Personal Information
     full_name = db.Column(db.String(255), nullable=False)
-    email = db.Column(db.String(255), nullable=False, unique=True)
+    email = db.Column(db.String(255), nullable=False, index=True)
     phone_numbers = db.Column(db.JSON, nullable=True)
     address = db.Column(db.String(500), nullable=True)
     linkedin_url = db.Column(db.String(255), nullable=True)
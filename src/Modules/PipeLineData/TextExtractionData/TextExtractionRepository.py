@@ -1,10 +1,12 @@
 from typing import Optional, List, Dict
 
 from src.Helpers.BaseRepository import BaseRepository
+from src.Modules.Candidate.Documents.DocumentModels import Document
 from src.Modules.PipeLineData.TextExtractionData.TextExtractionModels import (
     Resume, Education, WorkExperience, TechnicalSkill, SoftSkill, Keyword
 )
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
 
 
 class ResumeRepository(BaseRepository[Resume]):
@@ -49,7 +51,35 @@ class ResumeRepository(BaseRepository[Resume]):
         """
         try:
             print("Inside get by candidate Repository ", candidate_id)
-            return self._db.session.query(self._model).filter_by(candidate_id=candidate_id).all()
+            # Load every related collection up front, one query per collection instead of one per access
+            return (self._db.session.query(self._model)
+                    .options(selectinload(self._model.education),
+                             selectinload(self._model.work_experience),
+                             selectinload(self._model.technical_skills),
+                             selectinload(self._model.soft_skills),
+                             selectinload(self._model.keywords))
+                    .filter_by(candidate_id=candidate_id)
+                    .all())
+        except SQLAlchemyError as e:
+            self._db.session.rollback()
+            raise e
+
+    def get_by_document_hash(self, content_hash: str, exclude_candidate_id: Optional[str] = None) -> Optional[Resume]:
+        """
+        Get the most recent resume extracted from a document with the given content hash
+        """
+        try:
+            query = (self._db.session.query(self._model)
+                     .join(Document, Document.id == self._model.document_id)
+                     .options(selectinload(self._model.education),
+                              selectinload(self._model.work_experience),
+                              selectinload(self._model.technical_skills),
+                              selectinload(self._model.soft_skills),
+                              selectinload(self._model.keywords))
+                     .filter(Document.content_hash == content_hash))
+            if exclude_candidate_id:
+                query = query.filter(self._model.candidate_id != exclude_candidate_id)
+            return query.order_by(self._model.created_at.desc()).first()
         except SQLAlchemyError as e:
             self._db.session.rollback()
             raise e
@@ -1,7 +1,11 @@
 from datetime import datetime
+import copy
+import threading
 import uuid
 from typing import Dict, List, Optional
 
+from cachetools import TTLCache
+
 from src.Helpers.ErrorHandling import CustomError
 from src.Modules.PipeLineData.TextExtractionData.TextExtractionDTOs import (
     ResumeDTO, EducationDTO, WorkExperienceDTO, TechnicalSkillDTO, SoftSkillDTO, KeywordDTO
@@ -9,19 +13,21 @@ from src.Modules.PipeLineData.TextExtractionData.TextExtractionDTOs import (
 from src.Modules.PipeLineData.TextExtractionData.TextExtractionModels import (
     Resume, Education, WorkExperience, TechnicalSkill, SoftSkill, Keyword
 )
-from src.Modules.PipeLineData.TextExtractionData.TextExtractionRepository import (
-    ResumeRepository, EducationRepository, WorkExperienceRepository,
-    TechnicalSkillRepository, SoftSkillRepository, KeywordRepository
-)
+from src.Modules.PipeLineData.TextExtractionData.TextExtractionRepository import ResumeRepository
+# Resume DTOs by candidate id, shared by every service instance. The scraping and verification stages read
+# the same candidate's resume several times, entries are dropped whenever that resume is written.
+_resume_cache: TTLCache = TTLCache(maxsize=512, ttl=600)
+_resume_cache_lock = threading.Lock()
+
+
+def invalidate_cached_resume(candidate_id: str) -> None:
+    with _resume_cache_lock:
+        _resume_cache.pop(candidate_id, None)
+
 
 class TextExtractionDataService:
     def __init__(self):
         self.__resume_repository = ResumeRepository()
-        self.__education_repository = EducationRepository()
-        self.__experience_repository = WorkExperienceRepository()
-        self.__technical_skill_repository = TechnicalSkillRepository()
-        self.__soft_skill_repository = SoftSkillRepository()
-        self.__keyword_repository = KeywordRepository()
 
         # Initialize DTOs
         self.__resume_dto = ResumeDTO()
@@ -63,81 +69,42 @@ class TextExtractionDataService:
         Returns a resume DTO
         """
         try:
-            print("Inside resume get Service")
+            with _resume_cache_lock:
+                cached_resume = _resume_cache.get(candidate_id)
+            if cached_resume is not None:
+                return copy.deepcopy(cached_resume)
+
             resumes = self.__resume_repository.get_by_candidate_id(candidate_id)
-            print("this is my resume: ", resumes)
 
             if not resumes or len(resumes) == 0:
                 raise CustomError("Resume not found", 404)
 
             # Take the first resume since we expect one resume per candidate
-            resume = resumes[0]
-
-            # Transform the data to match DTO structure
-            resume_data = {
-                'personal_information': {
-                    'full_name': resume.full_name,
-                    'email': resume.email,
-                    'phone_numbers': resume.phone_numbers,
-                    'address': resume.address,
-                    'linkedin_url': resume.linkedin_url,
-                    'github_url': resume.github_url,
-                    'github_handle': resume.github_handle,
-                    'linkedin_handle': resume.linkedin_handle,
-                    'portfolio_url': resume.portfolio_url
-                },
-                'education': [
-                    {
-                        'institution': edu.institution,
-                        'degree': edu.degree,
-                        'field_of_study': edu.field_of_study,
-                        'start_date': edu.start_date,
-                        'end_date': edu.end_date,
-                        'gpa': edu.gpa,
-                        'description': edu.description,
-                        'location': edu.location
-                    } for edu in resume.education
-                ],
-                'work_experience': [
-                    {
-                        'company': exp.company,
-                        'position': exp.position,
-                        'employment_type': exp.employment_type,
-                        'start_date': exp.start_date,
-                        'end_date': exp.end_date,
-                        'is_current': exp.is_current,
-                        'location': exp.location,
-                        'description': exp.description,
-                        'achievements': exp.achievements
-                    } for exp in resume.work_experience
-                ],
-                'technical_skills': [
-                    {
-                        'skill_name': skill.skill_name,
-                        'proficiency_level': skill.proficiency_level,
-                        'years_experience': skill.years_experience
-                    } for skill in resume.technical_skills
-                ],
-                'soft_skills': [
-                    {
-                        'skill_name': skill.skill_name
-                    } for skill in resume.soft_skills
-                ],
-                'keywords': [
-                    {
-                        'keyword': kw.keyword,
-                        'category': kw.category
-                    } for kw in resume.keywords
-                ]
-            }
-
-            return self.__resume_dto.dump(resume_data)
+            resume_data = self.__resume_dto.dump(self.__to_resume_data(resumes[0]))
+            with _resume_cache_lock:
+                _resume_cache[candidate_id] = resume_data
+            return copy.deepcopy(resume_data)
+        except Exception as e:
+            raise CustomError(str(e), 400)
+
+    def get_resume_by_document_hash(self, content_hash: str, exclude_candidate_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get the extraction result of an earlier copy of the same document
+        Returns a resume DTO in the format accepted by create_resume, or None when the content is new
+        """
+        try:
+            resume = self.__resume_repository.get_by_document_hash(content_hash, exclude_candidate_id)
+            if not resume:
+                return None
+            return self.__resume_dto.dump(self.__to_resume_data(resume))
         except Exception as e:
             raise CustomError(str(e), 400)
 
-    def create_resume(self, resume_data: Dict, candidate_id: str) -> Dict:
+    def create_resume(self, resume_data: Dict, candidate_id: str, document_id: Optional[str] = None) -> Dict:
         """
         Create a new resume with all related entities
+        The whole object graph is written in a single transaction, so a failure leaves no partial resume behind
+        document_id links the resume to the document it was extracted from, for reuse by identical documents
         """
         try:
             # Validate input data using DTO
@@ -147,10 +114,11 @@ class TextExtractionDataService:
 
             personal_info = resume_data['personalInformation']
 
-            # Create main resume record
+            # Build main resume record
             resume = Resume(
                 id=str(uuid.uuid4()),
                 candidate_id=candidate_id,
+                document_id=document_id,
                 full_name=personal_info['fullName'],
                 email=personal_info['email'],
                 phone_numbers=personal_info.get('phoneNumbers'),
@@ -162,78 +130,65 @@ class TextExtractionDataService:
                 portfolio_url=personal_info.get('portfolioUrl')
             )
 
-            # Save the resume
+            # Build related records, they are inserted together with the resume through the relationship cascade
+            resume.education = [
+                Education(
+                    id=str(uuid.uuid4()),
+                    institution=edu_data['institution'],
+                    degree=edu_data['degree'],
+                    field_of_study=edu_data.get('fieldOfStudy'),
+                    start_date=edu_data.get('startDate'),
+                    end_date=edu_data.get('endDate'),
+                    gpa=edu_data.get('gpa'),
+                    description=edu_data.get('description'),
+                    location=edu_data.get('location')
+                ) for edu_data in resume_data.get('education', [])
+            ]
+
+            resume.work_experience = [
+                WorkExperience(
+                    id=str(uuid.uuid4()),
+                    company=exp_data['company'],
+                    position=exp_data['position'],
+                    employment_type=exp_data.get('employmentType'),
+                    start_date=exp_data.get('startDate'),
+                    end_date=exp_data.get('endDate'),
+                    is_current=exp_data.get('isCurrent', False),
+                    location=exp_data.get('location'),
+                    description=exp_data.get('description'),
+                    achievements=exp_data.get('achievements')
+                ) for exp_data in resume_data.get('workExperience', [])
+            ]
+
+            resume.technical_skills = [
+                TechnicalSkill(
+                    id=str(uuid.uuid4()),
+                    skill_name=skill_data['skillName'],
+                    proficiency_level=skill_data.get('proficiencyLevel'),
+                    years_experience=skill_data.get('yearsExperience')
+                ) for skill_data in resume_data.get('technicalSkills', [])
+            ]
+
+            resume.soft_skills = [
+                SoftSkill(
+                    id=str(uuid.uuid4()),
+                    skill_name=skill_data['skillName']
+                ) for skill_data in resume_data.get('softSkills', [])
+            ]
+
+            resume.keywords = [
+                Keyword(
+                    id=str(uuid.uuid4()),
+                    keyword=keyword_data['keyword'],
+                    category=keyword_data.get('category')
+                ) for keyword_data in resume_data.get('keywords', [])
+            ]
+
+            # Dump before committing, the commit expires the in-memory graph
+            created_resume = self.__resume_dto.dump(self.__to_resume_data(resume))
             self.__resume_repository.create(resume)
-
-            # Create education records
-            if 'education' in resume_data:
-                for edu_data in resume_data['education']:
-                    education = Education(
-                        id=str(uuid.uuid4()),
-                        resume_id=resume.id,
-                        institution=edu_data['institution'],
-                        degree=edu_data['degree'],
-                        field_of_study=edu_data.get('fieldOfStudy'),
-                        start_date=edu_data.get('startDate'),
-                        end_date=edu_data.get('endDate'),
-                        gpa=edu_data.get('gpa'),
-                        description=edu_data.get('description'),
-                        location=edu_data.get('location')
-                    )
-                    self.__education_repository.create(education)
-
-            # Create work experiences
-            if 'workExperience' in resume_data:
-                for exp_data in resume_data['workExperience']:
-                    experience = WorkExperience(
-                        id=str(uuid.uuid4()),
-                        resume_id=resume.id,
-                        company=exp_data['company'],
-                        position=exp_data['position'],
-                        employment_type=exp_data.get('employmentType'),
-                        start_date=exp_data.get('startDate'),
-                        end_date=exp_data.get('endDate'),
-                        is_current=exp_data.get('isCurrent', False),
-                        location=exp_data.get('location'),
-                        description=exp_data.get('description'),
-                        achievements=exp_data.get('achievements')
-                    )
-                    self.__experience_repository.create(experience)
-
-            # Create technical skills
-            if 'technicalSkills' in resume_data:
-                for skill_data in resume_data['technicalSkills']:
-                    skill = TechnicalSkill(
-                        id=str(uuid.uuid4()),
-                        resume_id=resume.id,
-                        skill_name=skill_data['skillName'],
-                        proficiency_level=skill_data.get('proficiencyLevel'),
-                        years_experience=skill_data.get('yearsExperience')
-                    )
-                    self.__technical_skill_repository.create(skill)
-
-            # Create soft skills
-            if 'softSkills' in resume_data:
-                for skill_data in resume_data['softSkills']:
-                    skill = SoftSkill(
-                        id=str(uuid.uuid4()),
-                        resume_id=resume.id,
-                        skill_name=skill_data['skillName']
-                    )
-                    self.__soft_skill_repository.create(skill)
-
-            # Create keywords
-            if 'keywords' in resume_data:
-                for keyword_data in resume_data['keywords']:
-                    keyword = Keyword(
-                        id=str(uuid.uuid4()),
-                        resume_id=resume.id,
-                        keyword=keyword_data['keyword'],
-                        category=keyword_data.get('category')
-                    )
-                    self.__keyword_repository.create(keyword)
-
-            return self.get_resume_by_id(resume.id)
+            invalidate_cached_resume(candidate_id)
+            return created_resume
 
         except Exception as e:
             raise CustomError(str(e), 400)
@@ -241,6 +196,7 @@ class TextExtractionDataService:
     def update_resume(self, resume_id: str, resume_data: Dict) -> Dict:
         """
         Update an existing resume and its related entities
+        Related records provided in the update replace the current ones, all in a single transaction
         Returns updated resume DTO
         """
         try:
@@ -253,33 +209,36 @@ class TextExtractionDataService:
             if errors:
                 raise CustomError(f"Invalid resume data: {errors}", 400)
 
-            # If email is being updated, check for duplicates
-            if 'email' in resume_data and resume_data['email'] != resume.email:
-                if self.__resume_repository.get_by_email(resume_data['email']):
-                    raise CustomError("Resume with this email already exists", 400)
-
-            # Update main resume fields
-            self.__update_resume_fields(resume, resume_data)
-
-            # Update related entities if provided in the update data
+            # Build every replacement first so invalid related data leaves the resume untouched
+            replacements = {}
             if 'education' in resume_data:
-                self.__update_education_records(resume.id, resume_data['education'])
+                replacements['education'] = self.__build_education_records(resume_data['education'])
 
             if 'experiences' in resume_data:
-                self.__update_experience_records(resume.id, resume_data['experiences'])
+                replacements['work_experience'] = self.__build_experience_records(resume_data['experiences'])
 
             if 'technicalSkills' in resume_data:
-                self.__update_technical_skill_records(resume.id, resume_data['technicalSkills'])
+                replacements['technical_skills'] = self.__build_technical_skill_records(
+                    resume_data['technicalSkills'])
 
             if 'softSkills' in resume_data:
-                self.__update_soft_skill_records(resume.id, resume_data['softSkills'])
+                replacements['soft_skills'] = self.__build_soft_skill_records(resume_data['softSkills'])
 
             if 'keywords' in resume_data:
-                self.__update_keyword_records(resume.id, resume_data['keywords'])
+                replacements['keywords'] = self.__build_keyword_records(resume_data['keywords'])
+
+            # Update main resume fields
+            self.__update_resume_fields(resume, resume_data)
+
+            # Replacing a collection deletes the old records through the delete-orphan cascade
+            for relationship, records in replacements.items():
+                setattr(resume, relationship, records)
 
-            # Update the resume
+            # Dump before committing, the commit expires the in-memory graph
+            updated_resume = self.__resume_dto.dump(self.__to_resume_data(resume))
             self.__resume_repository.update(resume)
-            return self.get_resume_by_id(resume.id)
+            invalidate_cached_resume(resume.candidate_id)
+            return updated_resume
         except Exception as e:
             raise CustomError(str(e), 400)
 
@@ -292,10 +251,74 @@ class TextExtractionDataService:
             if not resume:
                 raise CustomError("Resume not found", 404)
 
+            candidate_id = resume.candidate_id
             self.__resume_repository.delete(resume)
+            invalidate_cached_resume(candidate_id)
         except Exception as e:
             raise CustomError(str(e), 400)
 
+    @staticmethod
+    def __to_resume_data(resume: Resume) -> Dict:
+        """
+        Transform a resume and its related records to match the DTO structure
+        """
+        return {
+            'personal_information': {
+                'full_name': resume.full_name,
+                'email': resume.email,
+                'phone_numbers': resume.phone_numbers,
+                'address': resume.address,
+                'linkedin_url': resume.linkedin_url,
+                'github_url': resume.github_url,
+                'github_handle': resume.github_handle,
+                'linkedin_handle': resume.linkedin_handle,
+                'portfolio_url': resume.portfolio_url
+            },
+            'education': [
+                {
+                    'institution': edu.institution,
+                    'degree': edu.degree,
+                    'field_of_study': edu.field_of_study,
+                    'start_date': edu.start_date,
+                    'end_date': edu.end_date,
+                    'gpa': edu.gpa,
+                    'description': edu.description,
+                    'location': edu.location
+                } for edu in resume.education
+            ],
+            'work_experience': [
+                {
+                    'company': exp.company,
+                    'position': exp.position,
+                    'employment_type': exp.employment_type,
+                    'start_date': exp.start_date,
+                    'end_date': exp.end_date,
+                    'is_current': exp.is_current,
+                    'location': exp.location,
+                    'description': exp.description,
+                    'achievements': exp.achievements
+                } for exp in resume.work_experience
+            ],
+            'technical_skills': [
+                {
+                    'skill_name': skill.skill_name,
+                    'proficiency_level': skill.proficiency_level,
+                    'years_experience': skill.years_experience
+                } for skill in resume.technical_skills
+            ],
+            'soft_skills': [
+                {
+                    'skill_name': skill.skill_name
+                } for skill in resume.soft_skills
+            ],
+            'keywords': [
+                {
+                    'keyword': kw.keyword,
+                    'category': kw.category
+                } for kw in resume.keywords
+            ]
+        }
+
     def __update_resume_fields(self, resume: Resume, data: Dict) -> None:
         """
         Update the main resume fields
@@ -309,19 +332,19 @@ class TextExtractionDataService:
         resume.portfolio_url = data.get('portfolio_url', resume.portfolio_url)
         resume.updated_at = datetime.utcnow()
 
-    def __create_education_records(self, resume_id: str, education_data: List[Dict]) -> None:
+    def __build_education_records(self, education_data: List[Dict]) -> List[Education]:
         """
-        Create education records for a resume
+        Build education records for a resume
         """
+        records = []
         for edu_data in education_data:
             # Validate education data
             errors = self.__education_dto.validate(edu_data)
             if errors:
                 raise CustomError(f"Invalid education data: {errors}", 400)
 
-            education = Education(
+            records.append(Education(
                 id=str(uuid.uuid4()),
-                resume_id=resume_id,
                 institution=edu_data['institution'],
                 degree=edu_data['degree'],
                 field_of_study=edu_data['field_of_study'],
@@ -330,22 +353,22 @@ class TextExtractionDataService:
                 gpa=edu_data.get('gpa'),
                 description=edu_data.get('description'),
                 location=edu_data.get('location')
-            )
-            self.__education_repository.create(education)
+            ))
+        return records
 
-    def __create_experience_records(self, resume_id: str, experience_data: List[Dict]) -> None:
+    def __build_experience_records(self, experience_data: List[Dict]) -> List[WorkExperience]:
         """
-        Create work experience records for a resume
+        Build work experience records for a resume
         """
+        records = []
         for exp_data in experience_data:
             # Validate experience data
             errors = self.__work_experience_dto.validate(exp_data)
             if errors:
                 raise CustomError(f"Invalid work experience data: {errors}", 400)
 
-            experience = WorkExperience(
+            records.append(WorkExperience(
                 id=str(uuid.uuid4()),
-                resume_id=resume_id,
                 company=exp_data['company'],
                 position=exp_data['position'],
                 employment_type=exp_data.get('employment_type'),
@@ -355,104 +378,59 @@ class TextExtractionDataService:
                 location=exp_data.get('location'),
                 description=exp_data.get('description'),
                 achievements=exp_data.get('achievements')
-            )
-            self.__experience_repository.create(experience)
+            ))
+        return records
 
-    def __create_technical_skill_records(self, resume_id: str, skill_data: List[Dict]) -> None:
+    def __build_technical_skill_records(self, skill_data: List[Dict]) -> List[TechnicalSkill]:
         """
-        Create technical skill records for a resume
+        Build technical skill records for a resume
         """
+        records = []
         for skill in skill_data:
             # Validate technical skill data
             errors = self.__technical_skill_dto.validate(skill)
             if errors:
                 raise CustomError(f"Invalid technical skill data: {errors}", 400)
 
-            technical_skill = TechnicalSkill(
+            records.append(TechnicalSkill(
                 id=str(uuid.uuid4()),
-                resume_id=resume_id,
                 skill_name=skill['skill_name'],
                 proficiency_level=skill.get('proficiency_level'),
                 years_experience=skill.get('years_experience')
-            )
-            self.__technical_skill_repository.create(technical_skill)
+            ))
+        return records
 
-    def __create_soft_skill_records(self, resume_id: str, skill_data: List[Dict]) -> None:
+    def __build_soft_skill_records(self, skill_data: List[Dict]) -> List[SoftSkill]:
         """
-        Create soft skill records for a resume
+        Build soft skill records for a resume
         """
+        records = []
         for skill in skill_data:
             # Validate soft skill data
             errors = self.__soft_skill_dto.validate(skill)
             if errors:
                 raise CustomError(f"Invalid soft skill data: {errors}", 400)
 
-            soft_skill = SoftSkill(
+            records.append(SoftSkill(
                 id=str(uuid.uuid4()),
-                resume_id=resume_id,
                 skill_name=skill['skill_name']
-            )
-            self.__soft_skill_repository.create(soft_skill)
+            ))
+        return records
 
-    def __create_keyword_records(self, resume_id: str, keyword_data: List[Dict]) -> None:
+    def __build_keyword_records(self, keyword_data: List[Dict]) -> List[Keyword]:
         """
-        Create keyword records for a resume
+        Build keyword records for a resume
         """
+        records = []
         for kw in keyword_data:
             # Validate keyword data
             errors = self.__keyword_dto.validate(kw)
             if errors:
                 raise CustomError(f"Invalid keyword data: {errors}", 400)
 
-            keyword = Keyword(
+            records.append(Keyword(
                 id=str(uuid.uuid4()),
-                resume_id=resume_id,
                 keyword=kw['keyword'],
                 category=kw.get('category')
-            )
-            self.__keyword_repository.create(keyword)
-
-    def __update_education_records(self, resume_id: str, education_data: List[Dict]) -> None:
-        """
-        Update education records for a resume
-        """
-        current_records = self.__education_repository.get_by_resume_id(resume_id)
-        for record in current_records:
-            self.__education_repository.delete(record)
-        self.__create_education_records(resume_id, education_data)
-
-    def __update_experience_records(self, resume_id: str, experience_data: List[Dict]) -> None:
-        """
-        Update work experience records for a resume
-        """
-        current_records = self.__experience_repository.get_by_resume_id(resume_id)
-        for record in current_records:
-            self.__experience_repository.delete(record)
-        self.__create_experience_records(resume_id, experience_data)
-
-    def __update_technical_skill_records(self, resume_id: str, skill_data: List[Dict]) -> None:
-        """
-        Update technical skill records for a resume
-        """
-        current_records = self.__technical_skill_repository.get_by_resume_id(resume_id)
-        for record in current_records:
-            self.__technical_skill_repository.delete(record)
-        self.__create_technical_skill_records(resume_id, skill_data)
-
-    def __update_soft_skill_records(self, resume_id: str, skill_data: List[Dict]) -> None:
-        """
-        Update soft skill records for a resume
-        """
-        current_records = self.__soft_skill_repository.get_by_resume_id(resume_id)
-        for record in current_records:
-            self.__soft_skill_repository.delete(record)
-        self.__create_soft_skill_records(resume_id, skill_data)
-
-    def __update_keyword_records(self, resume_id: str, keyword_data: List[Dict]) -> None:
-        """
-        Update keyword records for a resume
-        """
-        current_records = self.__keyword_repository.get_by_resume_id(resume_id)
-        for record in current_records:
-            self.__keyword_repository.delete(record)
-        self.__create_keyword_records(resume_id, keyword_data)
\ No newline at end of file
+            ))
+        return records
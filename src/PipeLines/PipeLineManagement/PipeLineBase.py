@@ -14,6 +14,8 @@ import threading
 import logging
 import colorlog
 
+from src.Helpers.RetryPolicy import start_retry_run
+from src.Modules.LLMUsage.LLMUsageService import llm_usage_scope
 from src.PipeLines.PipeLineManagement.PipeLineModels import PipelineStatus
 from src.PipeLines.PipeLineManagement.PipeLineMonitor import PipelineMonitor
 
@@ -28,11 +30,13 @@ class PipelineConfig:
                  batch_size: int = 10,
                  idle_time: int = 60,  # seconds
                  process_interval: int = 300,  # seconds
+                 retry_budget: Optional[int] = None,  # retries per batch run, None uses llm.retry.run_budget
                  **kwargs):
         self.name = name
         self.batch_size = batch_size
         self.idle_time = idle_time
         self.process_interval = process_interval
+        self.retry_budget = retry_budget
         self.additional_config = kwargs
 
 
@@ -104,6 +108,8 @@ class BasePipeline(ABC):
         pass
 
     def process_batch(self) -> None:
+        start_retry_run(self.config.retry_budget)
+
         self.monitor.update_state(self.config.name, PipelineStatus.INPUT_FETCHED, "Fetching input data")
         input_data = self.get_input_data()
 
@@ -113,7 +119,11 @@ class BasePipeline(ABC):
         processed_data = []
         for item in input_data:
             try:
-                result = self.process_item(item)
+                # Attribute LLM usage to this stage and, for candidate items, to the candidate and job
+                with llm_usage_scope(stage=self.config.name,
+                                     candidate_id=getattr(item, 'id', None),
+                                     job_id=getattr(item, 'job_id', None)):
+                    result = self.process_item(item)
                 processed_data.append(result)
             except Exception as e:
                 self.logger.exception(f"Error processing item {item}: {str(e)}")
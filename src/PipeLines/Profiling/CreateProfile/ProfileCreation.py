@@ -1,12 +1,16 @@
 import json
 from typing import Dict, Optional
 
-from src.Helpers.LLMService import LLMService
+from src.Helpers.LLMProviders import PromptPrefix
+from src.Helpers.LLMService import LLMService, LLMTask
 from src.Modules.Jobs.JobService import JobService
 from src.Modules.PipeLineData.GithubSrapData.GithubScrapServices import GitHubScrapDataService
 from src.Modules.PipeLineData.LinkedInScrapData.LinkedInScrapService import LinkedInScrapDataService
 from src.Modules.PipeLineData.TextExtractionData.TextExtractionService import TextExtractionDataService
 
+# Bump when the profile instructions change, the job prefix key names the version
+PROFILE_PROMPT_VERSION = "v1"
+
 
 class ProfileCreationService:
     def __init__(self):
@@ -32,10 +36,14 @@ class ProfileCreationService:
 
         # print(f"cleaned_data: {json.dumps(cleaned_data['linkedin'], indent=2)}")
 
-        # Generate prompt and get profile analysis
-        prompt = self.__generate_llm_prompt(cleaned_data)
+        # Generate prompt and get profile analysis, the job part is shared by every applicant to the job
+        job_prefix = PromptPrefix(
+            key=f"{LLMTask.PROFILE_CREATION.value}:{PROFILE_PROMPT_VERSION}:job:{job_id}",
+            content=self.__generate_job_prompt(cleaned_data['job'])
+        )
+        prompt = self.__generate_candidate_prompt(cleaned_data)
         try:
-            profile_analysis = self.__llm_service.create_profile(prompt)
+            profile_analysis = self.__llm_service.create_profile(prompt, job_prefix)
             print("Candidate profile created", json.dumps(profile_analysis, indent=2))
             return profile_analysis
         except Exception as e:
@@ -136,7 +144,8 @@ class ProfileCreationService:
         return dict(sorted(language_usage.items(), key=lambda x: x[1], reverse=True)[:5])
 
 
-    def __generate_llm_prompt(self, cleaned_data: Dict) -> str:
+    def __generate_job_prompt(self, job_data: Dict) -> str:
+        """Instructions and job requirements, identical for every candidate of the same job"""
         json_structure = '''{
                               "overallMatch": {
                                 "score": "number (0-100)",
@@ -183,10 +192,9 @@ class ProfileCreationService:
 
         prompt = f"""Act as an expert technical recruiter analyzing candidate data against job requirements.
                 Context:
-                Job Requirements: {cleaned_data['job']}
-                Resume Data: {cleaned_data['resume']}
-                LinkedIn Data: {cleaned_data['linkedin']}
-                GitHub Data: {cleaned_data['github']}
+                Job Requirements: {job_data}
+                
+                The candidate's resume, LinkedIn and GitHub data follow these instructions.
                 
                 Task: Generate a comprehensive candidate-job match analysis as a JSON object with the following structure:
                 
@@ -205,4 +213,13 @@ class ProfileCreationService:
                 
                 Provide the analysis as a JSON object only, with no additional text.
                 """
-        return prompt
\ No newline at end of file
+        return prompt
+
+    @staticmethod
+    def __generate_candidate_prompt(cleaned_data: Dict) -> str:
+        """Candidate-specific part of the profile prompt, sent after the job prefix"""
+        return f"""Candidate Data:
+                Resume Data: {cleaned_data['resume']}
+                LinkedIn Data: {cleaned_data['linkedin']}
+                GitHub Data: {cleaned_data['github']}
+                """
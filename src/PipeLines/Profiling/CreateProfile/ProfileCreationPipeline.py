@@ -1,6 +1,8 @@
 from flask import Flask
 from typing import List, Optional, Dict
 
+from sqlalchemy import func
+
 from src.Modules.Candidate.CandidateService import CandidateService
 from src.Modules.PipeLineData.ProfileCreationData.ProfileCreationService import CandidateProfileDataService
 from src.PipeLines.PipeLineManagement.PipeLineBase import PipelineConfig, BasePipeline
@@ -8,6 +10,7 @@ from src.PipeLines.PipeLineManagement.PipeLineMonitor import PipelineMonitor
 from src.PipeLines.Profiling.CreateProfile.ProfileCreation import ProfileCreationService
 from src.Modules.Candidate.CandidateModels import Candidate, CandidatePipelineStatus
 from src.Helpers.ErrorHandling import CustomError
+from src.config.DBModelsConfig import db
 
 
 class ProfileCreationConfig(PipelineConfig):
@@ -35,8 +38,20 @@ class ProfileCreationPipeline(BasePipeline):
         self.__profileCreationDataService = CandidateProfileDataService()
 
     def get_input_data(self) -> List[Candidate]:
+        """
+        Candidates are grouped by job so consecutive profile creations share the job's prompt prefix.
+        The job with the longest-waiting applicant goes first, so no job is starved.
+        """
+        waiting_jobs = (db.session.query(Candidate.job_id,
+                                         func.min(Candidate.application_date).label('first_applied'))
+                        .filter(Candidate.pipeline_status == CandidatePipelineStatus.PROFILE_CREATION)
+                        .group_by(Candidate.job_id)
+                        .subquery())
+
         return (Candidate.query
-                .filter_by(pipeline_status=CandidatePipelineStatus.PROFILE_CREATION)
+                .join(waiting_jobs, Candidate.job_id == waiting_jobs.c.job_id)
+                .filter(Candidate.pipeline_status == CandidatePipelineStatus.PROFILE_CREATION)
+                .order_by(waiting_jobs.c.first_applied, Candidate.job_id, Candidate.application_date)
                 .limit(self.config.batch_size)
                 .all())
 
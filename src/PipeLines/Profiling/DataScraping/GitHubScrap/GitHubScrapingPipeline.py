@@ -9,6 +9,7 @@ from src.PipeLines.PipeLineManagement.PipeLineMonitor import PipelineMonitor
 from src.PipeLines.Profiling.DataScraping.GitHubScrap.GithubScraper import GitHubScraper
 from src.config.DBModelsConfig import db
 from src.Helpers.ErrorHandling import CustomError
+from src.Helpers.ScrapeStaging import get_scrape_staging
 
 
 class GitHubScrapingConfig(PipelineConfig):
@@ -29,6 +30,7 @@ class GitHubScrapingPipeline(BasePipeline):
         self.__candidateService = CandidateService()
         self.__googleScrapDataService = GoogleScrapDataService()
         self.__githubScrapDataService = GitHubScrapDataService()
+        self.__scrapeStaging = get_scrape_staging()
 
     def get_input_data(self) -> List[Candidate]:
         """Retrieve candidates needing GitHub scraping"""
@@ -44,13 +46,26 @@ class GitHubScrapingPipeline(BasePipeline):
             raise CustomError(f"No GitHub handle found for candidate {candidate.email}", 400)
 
         username = candidateGithubHandle["handle"]
-        github_info = self.__githubScrapper.get_user_stats(username)
+        refresh_due, known_pushed_at = self.__githubScrapDataService.get_refresh_state(username)
+        if not refresh_due:
+            # Scraped within the refresh TTL, reuse the stored profile without writing to it
+            return {
+                'candidate_id': candidate.id,
+                'username': username,
+                'github_info': None
+            }
+
+        # Scraped while verifying the handle in the Google stage, only fetched again when missing or stale
+        github_info = self.__scrapeStaging.get("github", candidate.id, username)
+        if github_info is None:
+            github_info = self.__githubScrapper.get_user_stats(username, known_pushed_at)
 
         if github_info is None:
             raise CustomError(f"Failed to fetch Github profile for :  {candidate.email}", 400)
 
         return {
             'candidate_id': candidate.id,
+            'username': username,
             'github_info': github_info
         }
 
@@ -58,10 +73,13 @@ class GitHubScrapingPipeline(BasePipeline):
         """Save GitHub data and update candidate status"""
         for result in results:
             if result:
-                self.__githubScrapDataService.save_profile(
-                    result['candidate_id'],
-                    result['github_info']
-                )
+                # A fresh stored profile is left as is, the candidate reads it through their GitHub handle
+                if result['github_info'] is not None:
+                    self.__githubScrapDataService.save_profile(
+                        result['candidate_id'],
+                        result['github_info']
+                    )
+                self.__scrapeStaging.discard("github", result['candidate_id'], result['username'])
                 self.__candidateService.set_pipeline_status_to_profile_creation(
                     result['candidate_id']
                 )
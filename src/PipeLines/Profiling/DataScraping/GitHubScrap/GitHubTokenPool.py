@@ -0,0 +1,166 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Tuple
+
+
+class GitHubRateLimitExhausted(Exception):
+    """Raised when every token is exhausted and the next reset is further away than the allowed wait"""
+    pass
+
+
+@dataclass
+class RateLimitState:
+    """Rate limit of one token for one resource (core, graphql, search), from the last response headers"""
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: float = 0.0  # epoch seconds
+
+
+@dataclass
+class TokenState:
+    token: str
+    requests: int = 0
+    blocked_until: float = 0.0  # secondary rate limit back-off, epoch seconds
+    limits: Dict[str, RateLimitState] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return f"...{self.token[-4:]}" if len(self.token) > 4 else "token"
+
+
+class GitHubTokenPool:
+    """
+    Rotates GitHub requests across several tokens.
+    Each request takes the available token with the most quota left for its resource. Tokens within
+    `reserve` requests of exhaustion are only used when nothing better is available, and when every
+    token is exhausted the caller waits for the earliest reset instead of failing.
+    """
+
+    def __init__(self, tokens: List[str], reserve: int = 50, max_wait_seconds: float = 900,
+                 secondary_backoff_seconds: float = 60):
+        if not tokens:
+            raise ValueError("At least one GitHub token is required")
+        self.reserve = reserve
+        self.max_wait_seconds = max_wait_seconds
+        self.secondary_backoff_seconds = secondary_backoff_seconds
+        self._tokens = [TokenState(token) for token in dict.fromkeys(tokens)]
+        self._lock = threading.Lock()
+
+    def __available_at(self, state: TokenState, resource: str, now: float) -> float:
+        """When the token can next be used for the resource, `now` if it can be used right away"""
+        limit = state.limits.get(resource)
+        available_at = max(now, state.blocked_until)
+        if limit and limit.remaining is not None and limit.remaining <= 0 and limit.reset_at > now:
+            available_at = max(available_at, limit.reset_at)
+        return available_at
+
+    def __pick(self, resource: str, now: float) -> Tuple[Optional[TokenState], float]:
+        """
+        The token to use and how long to wait before using it.
+        With no token ready, returns None and the time until the earliest one is.
+        """
+        ready = [s for s in self._tokens if self.__available_at(s, resource, now) <= now]
+        if not ready:
+            return None, min(self.__available_at(s, resource, now) for s in self._tokens) - now
+
+        def quota(s: TokenState) -> int:
+            limit = s.limits.get(resource)
+            # Unknown quota means the token has not been used for this resource yet
+            return limit.remaining if limit and limit.remaining is not None else 1 << 30
+
+        best = max(ready, key=quota)
+        limit = best.limits.get(resource)
+        if quota(best) > self.reserve or limit is None or limit.reset_at <= now:
+            return best, 0.0
+        # Every token is close to exhaustion, pace the remaining quota over the time left until the reset
+        return best, (limit.reset_at - now) / max(limit.remaining, 1)
+
+    def acquire(self, resource: str = "core") -> str:
+        """Returns the token to use for the next request, waiting for a rate limit reset if needed"""
+        while True:
+            with self._lock:
+                now = time.time()
+                state, wait_seconds = self.__pick(resource, now)
+                if state is not None:
+                    state.requests += 1
+                    limit = state.limits.get(resource)
+                    if limit and limit.remaining is not None:
+                        # Count the request now so concurrent callers spread over the tokens
+                        limit.remaining -= 1
+            if state is not None:
+                if wait_seconds > 0:
+                    time.sleep(min(wait_seconds, self.max_wait_seconds))
+                return state.token
+
+            if wait_seconds > self.max_wait_seconds:
+                raise GitHubRateLimitExhausted(
+                    f"All GitHub tokens are rate limited for {resource}, next reset in {wait_seconds:.0f}s"
+                )
+            print(f"All GitHub tokens are rate limited for {resource}, waiting {wait_seconds:.0f}s for the reset")
+            time.sleep(wait_seconds + 1)
+
+    def update(self, token: str, headers, status_code: int) -> bool:
+        """
+        Records the rate limit headers of a response.
+        Returns True when the request was rejected by a rate limit and should be retried.
+        """
+        with self._lock:
+            state = next((s for s in self._tokens if s.token == token), None)
+            if state is None:
+                return False
+
+            resource = headers.get("X-RateLimit-Resource", "core")
+            limit = state.limits.setdefault(resource, RateLimitState())
+            if headers.get("X-RateLimit-Remaining") is not None:
+                limit.limit = int(headers.get("X-RateLimit-Limit", 0)) or limit.limit
+                limit.remaining = int(headers["X-RateLimit-Remaining"])
+                limit.reset_at = float(headers.get("X-RateLimit-Reset", 0))
+
+            if status_code not in (403, 429):
+                return False
+
+            if limit.remaining == 0:
+                # Primary limit, acquire() skips the token until its reset
+                return True
+            if headers.get("Retry-After") is not None or status_code == 429:
+                # Secondary (abuse) limit, back off this token for a while
+                state.blocked_until = time.time() + float(headers.get("Retry-After") or self.secondary_backoff_seconds)
+                return True
+            return False
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-token usage gauges for monitoring, tokens are masked"""
+        with self._lock:
+            now = time.time()
+            return [{
+                "token": state.label,
+                "requests": state.requests,
+                "blocked_for_seconds": max(0, round(state.blocked_until - now)),
+                "limits": {
+                    resource: {
+                        "limit": limit.limit,
+                        "remaining": limit.remaining,
+                        "reset_in_seconds": max(0, round(limit.reset_at - now))
+                    } for resource, limit in state.limits.items()
+                }
+            } for state in self._tokens]
+
+
+_pools: Dict[Tuple[str, ...], GitHubTokenPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_token_pool(tokens: List[str], **settings) -> GitHubTokenPool:
+    """Process-wide pool per token set, every stage scraping GitHub shares the same quota view"""
+    key = tuple(dict.fromkeys(tokens))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = GitHubTokenPool(list(key), **settings)
+        return _pools[key]
+
+
+def token_pool_snapshot() -> List[Dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [entry for pool in pools for entry in pool.snapshot()]
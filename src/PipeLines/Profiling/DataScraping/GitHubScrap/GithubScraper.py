@@ -1,22 +1,156 @@
+import asyncio
 import re
-from typing import Union
+from typing import Union, Optional, Dict, Any, List
 
+import httpx
 import requests
 import json
-from datetime import datetime, timedelta
+
+from src.Helpers.CacheStats import cache_stats
+from src.Helpers.DiskCache import DiskTTLCache
+from src.PipeLines.Profiling.DataScraping.GitHubScrap.GitHubTokenPool import get_token_pool
+from src.config.ConfigBase import Config
+
+# Share of conditional REST requests answered 304 Not Modified, which GitHub does not count against the rate limit
+not_modified_stats = cache_stats("github_not_modified")
+
+# Last-year contribution totals by kind, shared by the profile and the contributions-only queries
+CONTRIBUTIONS_FIELDS = """contributionsCollection {
+      totalCommitContributions totalPullRequestContributions totalIssueContributions
+      totalPullRequestReviewContributions restrictedContributionsCount
+      contributionCalendar { totalContributions }
+    }"""
+
+# Profile, repositories and contribution totals of a user, one page of repositories per request
+# The contribution totals are only requested with the first page
+USER_STATS_QUERY = """
+query($login: String!, $pageSize: Int!, $cursor: String, $historySize: Int!, $withContributions: Boolean!) {
+  user(login: $login) {
+    login name bio company location email websiteUrl twitterUsername avatarUrl url
+    createdAt updatedAt isHireable isSiteAdmin
+    followers { totalCount }
+    following { totalCount }
+    gists(privacy: PUBLIC) { totalCount }
+    ... @include(if: $withContributions) {
+      %s
+    }
+    repositories(ownerAffiliations: OWNER, privacy: PUBLIC, first: $pageSize, after: $cursor,
+                 orderBy: {field: PUSHED_AT, direction: DESC}) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name nameWithOwner description homepageUrl url sshUrl
+        stargazerCount forkCount diskUsage createdAt updatedAt pushedAt
+        hasWikiEnabled hasProjectsEnabled isArchived isDisabled isPrivate isFork
+        primaryLanguage { name }
+        languages(first: 20, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+        watchers { totalCount }
+        issues(states: OPEN) { totalCount }
+        pullRequests(states: OPEN) { totalCount }
+        licenseInfo { name }
+        defaultBranchRef {
+          name
+          target {
+            ... on Commit {
+              history(first: $historySize) {
+                totalCount
+                nodes {
+                  oid message
+                  author { name date user { login avatarUrl url } }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+""" % CONTRIBUTIONS_FIELDS
+
+# Stars of the repositories after a cursor, for star totals over repositories not read in detail
+REPO_STARS_QUERY = """
+query($login: String!, $cursor: String) {
+  user(login: $login) {
+    repositories(ownerAffiliations: OWNER, privacy: PUBLIC, first: 100, after: $cursor,
+                 orderBy: {field: PUSHED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes { stargazerCount }
+    }
+  }
+}
+"""
+
+# Contribution totals of the last year, GitHub's contributionsCollection defaults to that window
+CONTRIBUTIONS_QUERY = """
+query($login: String!) {
+  user(login: $login) {
+    %s
+  }
+}
+""" % CONTRIBUTIONS_FIELDS
+
+
+class CachedResponse:
+    """The parts of a REST response the scraper reads, rebuilt from the response cache on 304 Not Modified"""
+
+    def __init__(self, status_code: int, body: Any, links: Optional[Dict[str, Any]] = None):
+        self.status_code = status_code
+        self.body = body
+        self.links = links or {}
+
+    def json(self) -> Any:
+        return self.body
 
 
 class GitHubScraper:
-    def __init__(self, token):
+    def __init__(self, token, mode: Optional[str] = None):
         self.headers = {
-            'Authorization': f'token {token}',
             'Accept': 'application/vnd.github.v3+json'
         }
         self.base_url = 'https://api.github.com'
+        self.graphql_url = 'https://api.github.com/graphql'
 
+        github_config = (Config().getConfig().get("profiler") or {}).get("github") or {}
+        # Requests rotate over every configured token, the pool is shared by all scrapers in the process
+        rate_limit_config = github_config.get("rate_limit") or {}
+        self.token_pool = get_token_pool(
+            [t for t in (github_config.get("tokens") or [token]) if t] or [token],
+            reserve=rate_limit_config.get("reserve", 50),
+            max_wait_seconds=rate_limit_config.get("max_wait_seconds", 900),
+            secondary_backoff_seconds=rate_limit_config.get("secondary_backoff_seconds", 60)
+        )
+        self.max_rate_limit_retries = rate_limit_config.get("max_retries", 5)
+        # "rest" walks the REST API repo by repo, "graphql" reads the same data in a few paginated queries
+        self.mode = mode or github_config.get("mode", "rest")
+        self.graphql_page_size = github_config.get("graphql_page_size", 25)
+        self.graphql_history_size = github_config.get("graphql_history_size", 30)
 
-    def get_user_stats(self, identifier) -> Union[dict, None]:
-        """Fetch comprehensive user statistics by username"""
+        # Repositories are listed most recently pushed first, only the top-N real ones are scraped in detail
+        self.max_detailed_repos = github_config.get("max_detailed_repos", 30)
+        self.max_repo_pages = github_config.get("max_repo_pages", 10)
+        self.include_forks = github_config.get("include_forks", False)
+        self.include_archived = github_config.get("include_archived", False)
+        # REST detail requests (languages, commits, contributors) in flight at once, 1 fetches them one by one
+        self.rest_concurrency = github_config.get("rest_concurrency", 8)
+
+        # REST responses by URL with their validators, so repeat scrapes are answered with 304 Not Modified
+        cache_config = github_config.get("response_cache") or {}
+        self.response_cache = DiskTTLCache(
+            cache_config.get("path", "./src/Static/Cache/GitHub"),
+            cache_config.get("ttl_days", 30) * 86400,
+            name="github_response_cache"
+        ) if cache_config.get("enabled", True) else None
+
+    def get_user_stats(self, identifier, known_pushed_at: Optional[Dict[str, str]] = None) -> Union[dict, None]:
+        """
+        Fetch comprehensive user statistics by username
+        known_pushed_at maps the full_name of already stored repos to their pushed_at, in rest mode repos not
+        pushed to since are returned as {'name', 'full_name', 'unchanged': True} without their details
+        (GraphQL reads all details in the same queries anyway)
+        """
+        if self.mode == "graphql":
+            return self._get_user_stats_graphql(identifier)
         print("fetching user info for by username:  '{}'".format(identifier))
         user_info = self._get_user_info(identifier)
         if not user_info:
@@ -26,9 +160,10 @@ class GitHubScraper:
         try:
             username = user_info['login']
             user_repos = self._get_user_repos(username)
-            contributions = self._get_yearly_contributions(username)
+            contribution_stats = self._get_contribution_stats(username)
+            contributions = contribution_stats['total']
             total_stars = sum(repo['stargazers_count'] for repo in user_repos)
-            rating = self._calculate_user_rating(user_info, total_stars, contributions)
+            rating = self._calculate_user_rating(user_info, total_stars, contribution_stats)
         except Exception as e:
             print(f"Error fetching user statistics: {str(e)}")
             return None
@@ -54,6 +189,7 @@ class GitHubScraper:
                 'following': user_info['following'],
                 'total_stars_earned': total_stars,
                 'contributions_last_year': contributions,
+                'contributions_breakdown': contribution_stats,
                 'rating': rating
             },
             'dates': {
@@ -76,63 +212,321 @@ class GitHubScraper:
             'repositories': []
         }
 
-        # Get detailed repository information
-        for repo in user_repos:
-            languages = self._get_repo_languages(username, repo['name'])
-            commits = self._get_repo_commits(username, repo['name'])
-            contributors = self._get_repo_contributors(username, repo['name'])
-            repo_info = {
-                'name': repo['name'],
-                'full_name': repo['full_name'],
-                'description': repo['description'],
-                'homepage': repo['homepage'],
-                'language': repo['language'],
-                'languages_breakdown': languages,
-                'stats': {
-                    'stars': repo['stargazers_count'],
-                    'watchers': repo['watchers_count'],
-                    'forks': repo['forks_count'],
-                    'open_issues': repo['open_issues_count'],
-                    'size': repo['size'],
-                    'commit_count': len(commits),
-                    'contributor_count': len(contributors)
-                },
-                'dates': {
-                    'created_at': repo['created_at'],
-                    'updated_at': repo['updated_at'],
-                    'pushed_at': repo['pushed_at']
-                },
-                'urls': {
-                    'html_url': repo['html_url'],
-                    'clone_url': repo['clone_url'],
-                    'ssh_url': repo['ssh_url'],
-                    'api_url': repo['url']
-                },
-                'features': {
-                    'has_wiki': repo['has_wiki'],
-                    'has_pages': repo['has_pages'],
-                    'has_projects': repo['has_projects'],
-                    'has_downloads': repo['has_downloads'],
-                    'archived': repo['archived'],
-                    'disabled': repo['disabled'],
-                    'private': repo['private'],
-                    'fork': repo['fork']
-                },
-                'branch': {
-                    'default_branch': repo['default_branch']
-                },
-                'license': repo['license'].get('name') if repo['license'] else None,
-                'latest_commits': self._get_latest_commits(username, repo['name']),
-                'top_contributors': self._get_top_contributors(contributors)
-            }
-            profile_data['repositories'].append(repo_info)
+        # Get detailed repository information, concurrently unless rest_concurrency is 1
+        detailed_repos = []
+        for repo in self._select_detailed_repos(user_repos, 'fork', 'archived'):
+            if known_pushed_at and repo['pushed_at'] and known_pushed_at.get(repo['full_name']) == repo['pushed_at']:
+                profile_data['repositories'].append({'name': repo['name'], 'full_name': repo['full_name'],
+                                                     'unchanged': True})
+            else:
+                detailed_repos.append(repo)
+
+        if self.rest_concurrency > 1:
+            details = asyncio.run(self._get_repo_details_async(username, detailed_repos))
+        else:
+            details = [(self._get_repo_languages(username, repo['name']),
+                        self._get_repo_commits(username, repo['name']),
+                        self._get_repo_contributors(username, repo['name'])) for repo in detailed_repos]
+
+        for repo, (languages, commits, contributors) in zip(detailed_repos, details):
+            profile_data['repositories'].append(self._rest_repo_info(repo, languages, commits, contributors))
             print("Finished fetching repo info for '{}'".format(repo['name']))
         return profile_data
 
+    """
+    *******************************************************************************************************************
+    GraphQL v4
+    """
+
+    def _send(self, method: str, url: str, resource: str, headers: Optional[Dict[str, str]] = None,
+              **kwargs) -> requests.Response:
+        """
+        Send a request with the pool's best token for the resource (core, search or graphql).
+        Responses rejected by a primary or secondary rate limit are retried with another token,
+        or after the reset when every token is exhausted.
+        """
+        for _ in range(self.max_rate_limit_retries):
+            token = self.token_pool.acquire(resource)
+            request_headers = {**self.headers, **(headers or {}), 'Authorization': f'token {token}'}
+            response = requests.request(method, url, headers=request_headers, **kwargs)
+            if not self.token_pool.update(token, response.headers, response.status_code):
+                return response
+            print(f"GitHub rate limit hit for {resource} ({response.status_code}), retrying with the next token")
+        return response
+
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a GraphQL query, raising on transport or query errors"""
+        response = self._send('POST', self.graphql_url, 'graphql',
+                              json={'query': query, 'variables': variables})
+        if response.status_code != 200:
+            raise Exception(f"GraphQL request failed: {response.status_code} {response.text[:200]}")
+
+        payload = response.json()
+        if payload.get('errors'):
+            # A missing user is reported as a NOT_FOUND error alongside a null user
+            if all(error.get('type') == 'NOT_FOUND' for error in payload['errors']):
+                return payload.get('data') or {}
+            raise Exception(f"GraphQL query failed: {payload['errors']}")
+        return payload['data']
+
+    def _get_user_stats_graphql(self, username) -> Union[dict, None]:
+        """Same profile_data as the REST mode, built from one query per page of repositories, up to max_repo_pages"""
+        print("fetching user info with GraphQL for username:  '{}'".format(username))
+        try:
+            user, repos, cursor = None, [], None
+            for _ in range(self.max_repo_pages):
+                data = self._graphql(USER_STATS_QUERY, {
+                    'login': username,
+                    'pageSize': self.graphql_page_size,
+                    'cursor': cursor,
+                    'historySize': self.graphql_history_size,
+                    'withContributions': user is None
+                })
+                page_user = data.get('user')
+                if not page_user:
+                    print(f"Could not fetch user info for {username}")
+                    return None
+
+                user = user or page_user
+                repos.extend(page_user['repositories']['nodes'])
+                page_info = page_user['repositories']['pageInfo']
+                # Ordered by push date, later pages only hold older repositories
+                enough = len(self._select_detailed_repos(repos, 'isFork', 'isArchived')) >= self.max_detailed_repos
+                if not page_info['hasNextPage'] or enough:
+                    break
+                cursor = page_info['endCursor']
+
+            # Stars of the older repositories left unread, so the star total matches the REST mode
+            remaining_stars = 0
+            if page_info['hasNextPage']:
+                remaining_stars = self._graphql_remaining_stars(username, page_info['endCursor'])
+            return self._graphql_profile_data(user, repos, remaining_stars)
+        except Exception as e:
+            print(f"Error fetching user statistics: {str(e)}")
+            return None
+
+    def _graphql_remaining_stars(self, username, cursor: str) -> int:
+        """Sum of stars over the repositories after the cursor, 100 per query up to max_repo_pages queries"""
+        total_stars = 0
+        for _ in range(self.max_repo_pages):
+            data = self._graphql(REPO_STARS_QUERY, {'login': username, 'cursor': cursor})
+            repositories = (data.get('user') or {}).get('repositories')
+            if not repositories:
+                break
+            total_stars += sum(repo['stargazerCount'] for repo in repositories['nodes'])
+            if not repositories['pageInfo']['hasNextPage']:
+                break
+            cursor = repositories['pageInfo']['endCursor']
+        return total_stars
+
+    def _graphql_profile_data(self, user: Dict[str, Any], repos: List[Dict[str, Any]],
+                              remaining_stars: int = 0) -> dict:
+        login = user['login']
+        api_user_url = f'{self.base_url}/users/{login}'
+        total_stars = sum(repo['stargazerCount'] for repo in repos) + remaining_stars
+        contribution_stats = self._contribution_stats(user['contributionsCollection'])
+        contributions = contribution_stats['total']
+        public_repos = user['repositories']['totalCount']
+
+        user_info = {'followers': user['followers']['totalCount'], 'public_repos': public_repos}
+        profile_data = {
+            'basic_info': {
+                'username': login,
+                'name': user['name'],
+                'bio': user['bio'],
+                'company': user['company'],
+                'location': user['location'],
+                'email': user['email'] or 'Not public',
+                'blog': user['websiteUrl'] or '',
+                'twitter_username': user['twitterUsername'],
+                'avatar_url': user['avatarUrl']
+            },
+            'stats': {
+                'public_repos': public_repos,
+                'public_gists': user['gists']['totalCount'],
+                'followers': user['followers']['totalCount'],
+                'following': user['following']['totalCount'],
+                'total_stars_earned': total_stars,
+                'contributions_last_year': contributions,
+                'contributions_breakdown': contribution_stats,
+                'rating': self._calculate_user_rating(user_info, total_stars, contribution_stats)
+            },
+            'dates': {
+                'created_at': user['createdAt'],
+                'updated_at': user['updatedAt']
+            },
+            'urls': {
+                'github_url': user['url'],
+                'repos_url': f'{api_user_url}/repos',
+                'gists_url': f'{api_user_url}/gists',
+                'starred_url': f'{api_user_url}/starred',
+                'followers_url': f'{api_user_url}/followers',
+                'following_url': f'{api_user_url}/following'
+            },
+            'additional_info': {
+                'hireable': user['isHireable'],
+                'type': 'User',
+                'is_site_admin': user['isSiteAdmin']
+            },
+            'repositories': [self._graphql_repo_info(login, repo)
+                             for repo in self._select_detailed_repos(repos, 'isFork', 'isArchived')]
+        }
+        return profile_data
+
+    def _graphql_repo_info(self, login: str, repo: Dict[str, Any]) -> dict:
+        branch = repo.get('defaultBranchRef') or {}
+        history = (branch.get('target') or {}).get('history') or {'totalCount': 0, 'nodes': []}
+        contributors = self._graphql_contributors(history['nodes'])
+
+        return {
+            'name': repo['name'],
+            'full_name': repo['nameWithOwner'],
+            'description': repo['description'],
+            'homepage': repo['homepageUrl'],
+            'language': (repo.get('primaryLanguage') or {}).get('name'),
+            'languages_breakdown': {edge['node']['name']: edge['size'] for edge in repo['languages']['edges']},
+            'stats': {
+                'stars': repo['stargazerCount'],
+                'watchers': repo['watchers']['totalCount'],
+                'forks': repo['forkCount'],
+                # The REST open_issues_count includes pull requests
+                'open_issues': repo['issues']['totalCount'] + repo['pullRequests']['totalCount'],
+                'size': repo['diskUsage'],
+                'commit_count': history['totalCount'],  # full history of the default branch
+                'contributor_count': len(contributors)
+            },
+            'dates': {
+                'created_at': repo['createdAt'],
+                'updated_at': repo['updatedAt'],
+                'pushed_at': repo['pushedAt']
+            },
+            'urls': {
+                'html_url': repo['url'],
+                'clone_url': f"{repo['url']}.git",
+                'ssh_url': repo['sshUrl'],
+                'api_url': f"{self.base_url}/repos/{repo['nameWithOwner']}"
+            },
+            'features': {
+                'has_wiki': repo['hasWikiEnabled'],
+                'has_pages': False,  # not exposed by GraphQL
+                'has_projects': repo['hasProjectsEnabled'],
+                'has_downloads': True,  # deprecated, always true in REST
+                'archived': repo['isArchived'],
+                'disabled': repo['isDisabled'],
+                'private': repo['isPrivate'],
+                'fork': repo['isFork']
+            },
+            'branch': {
+                'default_branch': branch.get('name')
+            },
+            'license': (repo.get('licenseInfo') or {}).get('name'),
+            'latest_commits': [{
+                'sha': commit['oid'],
+                'message': commit['message'],
+                'author': commit['author']['name'],
+                'date': commit['author']['date']
+            } for commit in history['nodes'][:5]],
+            'top_contributors': self._get_top_contributors(contributors)
+        }
+
+    @staticmethod
+    def _graphql_contributors(commits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Contributors ranked by their share of the recent commits on the default branch,
+        GraphQL has no contributors connection
+        """
+        contributors: Dict[str, Dict[str, Any]] = {}
+        for commit in commits:
+            author = commit.get('author') or {}
+            account = author.get('user')
+            if not account:
+                continue
+            entry = contributors.setdefault(account['login'], {
+                'login': account['login'],
+                'contributions': 0,
+                'avatar_url': account['avatarUrl'],
+                'html_url': account['url']
+            })
+            entry['contributions'] += 1
+        return list(contributors.values())
+
+    """
+    *******************************************************************************************************************
+    REST v3
+    """
+
+    def get_user_summary(self, username) -> Union[dict, None]:
+        """Fetch only the public profile of a user (one request), used to rank search results before a full scrape"""
+        try:
+            return self._get_user_info(username)
+        except Exception as e:
+            print(f"Could not fetch profile summary for {username}: {str(e)}")
+            return None
+
+    def _rest_get(self, url) -> CachedResponse:
+        """
+        GET a REST resource as a conditional request when an earlier response is cached,
+        sending its ETag / Last-Modified and reusing the cached body on 304 Not Modified
+        """
+        cached, headers = self._conditional_headers(url)
+        response = self._send('GET', url, self._rest_resource(url), headers)
+        return self._cached_response(url, cached, response)
+
+    async def _rest_get_async(self, client: httpx.AsyncClient, url) -> CachedResponse:
+        """_rest_get on a shared async connection pool, waiting for a token without blocking the event loop"""
+        cached, headers = self._conditional_headers(url)
+        resource = self._rest_resource(url)
+        for _ in range(self.max_rate_limit_retries):
+            token = await asyncio.to_thread(self.token_pool.acquire, resource)
+            response = await client.get(url, headers={**headers, 'Authorization': f'token {token}'})
+            if not self.token_pool.update(token, response.headers, response.status_code):
+                break
+            print(f"GitHub rate limit hit for {resource} ({response.status_code}), retrying with the next token")
+        return self._cached_response(url, cached, response)
+
+    @staticmethod
+    def _rest_resource(url) -> str:
+        return 'search' if '/search/' in url else 'core'
+
+    def _conditional_headers(self, url):
+        """The cached entry for the URL, if any, and the request headers validating it"""
+        cached = self.response_cache.get(url) if self.response_cache else None
+        headers = dict(self.headers)
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        return cached, headers
+
+    def _cached_response(self, url, cached, response) -> CachedResponse:
+        """Resolves a 304 to the cached body and caches a fresh 200 with its validators"""
+        if response.status_code == 304 and cached:
+            not_modified_stats.record_hit()
+            return CachedResponse(200, cached['body'], cached.get('links'))
+        if cached:
+            not_modified_stats.record_miss()
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        links = dict(response.links)
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if self.response_cache and response.status_code == 200 and (etag or last_modified):
+            self.response_cache.put(url, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'body': body,
+                'links': links
+            })
+        return CachedResponse(response.status_code, body, links)
+
     def _search_user_by_email(self, email):
         """Search for a user by email"""
         url = f'{self.base_url}/search/users?q={email}+in:email'
-        response = requests.get(url, headers=self.headers)
+        response = self._rest_get(url)
         if response.status_code != 200:
             raise Exception(f"Failed to search user by email: {response.json()}")
 
@@ -142,22 +536,37 @@ class GitHubScraper:
 
         return self._get_user_info(results['items'][0]['login'])
 
-    def _get_yearly_contributions(self, username):
-        """Get user's contributions for the last year"""
-        url = f'{self.base_url}/users/{username}/events'
-        response = requests.get(url, headers=self.headers)
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch user events: {response.json()}")
-
-        events = response.json()
-        one_year_ago = datetime.now() - timedelta(days=365)
-        contribution_count = sum(1 for event in events
-                                 if datetime.strptime(event['created_at'], '%Y-%m-%dT%H:%M:%SZ') > one_year_ago)
+    def _get_contribution_stats(self, username) -> Dict[str, int]:
+        """
+        Get user's contribution totals for the last year, one GraphQL query
+        A failed query counts as no contributions rather than failing the rest mode scrape
+        """
+        try:
+            data = self._graphql(CONTRIBUTIONS_QUERY, {'login': username})
+            if not data.get('user'):
+                raise Exception("user not found")
+            return self._contribution_stats(data['user']['contributionsCollection'])
+        except Exception as e:
+            print(f"Could not fetch contributions of {username}, counting none: {str(e)}")
+            return {'total': 0, 'commits': 0, 'pull_requests': 0, 'issues': 0, 'reviews': 0, 'private': 0}
 
-        return contribution_count
+    @staticmethod
+    def _contribution_stats(collection: Dict[str, Any]) -> Dict[str, int]:
+        return {
+            'total': collection['contributionCalendar']['totalContributions'],
+            'commits': collection['totalCommitContributions'],
+            'pull_requests': collection['totalPullRequestContributions'],
+            'issues': collection['totalIssueContributions'],
+            'reviews': collection['totalPullRequestReviewContributions'],
+            # Contributions to private repositories, counted in the total without details
+            'private': collection['restrictedContributionsCount']
+        }
 
-    def _calculate_user_rating(self, user_info, total_stars, contributions):
+    def _calculate_user_rating(self, user_info, total_stars, contribution_stats):
         """Calculate user rating based on various metrics"""
+        # Pull requests and reviews take more work than a commit or an issue
+        contributions = (contribution_stats['commits'] + contribution_stats['issues'] + contribution_stats['private'] +
+                         2 * (contribution_stats['pull_requests'] + contribution_stats['reviews']))
         score = (
                 user_info['followers'] +
                 (user_info['public_repos'] * 2) +
@@ -187,23 +596,111 @@ class GitHubScraper:
     def _get_user_info(self, username):
         """Fetch user info"""
         url = f'{self.base_url}/users/{username}'
-        response = requests.get(url, headers=self.headers)
+        response = self._rest_get(url)
         if response.status_code != 200:
             raise Exception(f"Failed to fetch user info: {response.json()}")
         return response.json()
 
     def _get_user_repos(self, username):
-        """Fetch user repositories"""
-        url = f'{self.base_url}/users/{username}/repos'
-        response = requests.get(url, headers=self.headers)
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch repos: {response.json()}")
-        return response.json()
+        """Fetch user repositories, most recently pushed first, following the Link header across pages"""
+        url = f'{self.base_url}/users/{username}/repos?type=owner&sort=pushed&direction=desc&per_page=100'
+        repos = []
+        for _ in range(self.max_repo_pages):
+            response = self._rest_get(url)
+            if response.status_code != 200:
+                raise Exception(f"Failed to fetch repos: {response.json()}")
+            repos.extend(response.json())
+
+            next_page = response.links.get('next')
+            if not next_page:
+                break
+            url = next_page['url']
+        return repos
+
+    def _select_detailed_repos(self, repos: List[Dict[str, Any]], fork_key: str, archived_key: str) -> List[Dict[str, Any]]:
+        """The repos that get the full detail scrape: the most recent top-N, skipping forks and archived ones"""
+        selected = [repo for repo in repos
+                    if (self.include_forks or not repo[fork_key]) and
+                    (self.include_archived or not repo[archived_key])]
+        return selected[:self.max_detailed_repos]
+
+    async def _get_repo_details_async(self, owner, repos: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        Languages, commits and contributors of every repo, fetched concurrently over one connection pool.
+        At most rest_concurrency requests are in flight, each still takes its token from the rate limit pool.
+        """
+        semaphore = asyncio.Semaphore(self.rest_concurrency)
+        limits = httpx.Limits(max_connections=self.rest_concurrency, max_keepalive_connections=self.rest_concurrency)
+
+        async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+            async def fetch(url):
+                async with semaphore:
+                    return await self._rest_get_async(client, url)
+
+            async def repo_details(repo):
+                repo_url = f'{self.base_url}/repos/{owner}/{repo["name"]}'
+                languages, commits, contributors = await asyncio.gather(
+                    fetch(f'{repo_url}/languages'), fetch(f'{repo_url}/commits'), fetch(f'{repo_url}/contributors')
+                )
+                if languages.status_code != 200:
+                    raise Exception(f"Failed to fetch languages: {languages.json()}")
+                return (languages.json(),
+                        commits.json() if commits.status_code == 200 else [],
+                        contributors.json() if contributors.status_code == 200 else [])
+
+            return list(await asyncio.gather(*(repo_details(repo) for repo in repos)))
+
+    def _rest_repo_info(self, repo: Dict[str, Any], languages: Dict[str, int], commits: List[Dict[str, Any]],
+                        contributors: List[Dict[str, Any]]) -> dict:
+        return {
+            'name': repo['name'],
+            'full_name': repo['full_name'],
+            'description': repo['description'],
+            'homepage': repo['homepage'],
+            'language': repo['language'],
+            'languages_breakdown': languages,
+            'stats': {
+                'stars': repo['stargazers_count'],
+                'watchers': repo['watchers_count'],
+                'forks': repo['forks_count'],
+                'open_issues': repo['open_issues_count'],
+                'size': repo['size'],
+                'commit_count': len(commits),
+                'contributor_count': len(contributors)
+            },
+            'dates': {
+                'created_at': repo['created_at'],
+                'updated_at': repo['updated_at'],
+                'pushed_at': repo['pushed_at']
+            },
+            'urls': {
+                'html_url': repo['html_url'],
+                'clone_url': repo['clone_url'],
+                'ssh_url': repo['ssh_url'],
+                'api_url': repo['url']
+            },
+            'features': {
+                'has_wiki': repo['has_wiki'],
+                'has_pages': repo['has_pages'],
+                'has_projects': repo['has_projects'],
+                'has_downloads': repo['has_downloads'],
+                'archived': repo['archived'],
+                'disabled': repo['disabled'],
+                'private': repo['private'],
+                'fork': repo['fork']
+            },
+            'branch': {
+                'default_branch': repo['default_branch']
+            },
+            'license': repo['license'].get('name') if repo['license'] else None,
+            'latest_commits': self._format_latest_commits(commits),
+            'top_contributors': self._get_top_contributors(contributors)
+        }
 
     def _get_repo_languages(self, owner, repo):
         """Fetch repository languages"""
         url = f'{self.base_url}/repos/{owner}/{repo}/languages'
-        response = requests.get(url, headers=self.headers)
+        response = self._rest_get(url)
         if response.status_code != 200:
             raise Exception(f"Failed to fetch languages: {response.json()}")
         return response.json()
@@ -211,7 +708,7 @@ class GitHubScraper:
     def _get_repo_commits(self, owner, repo):
         """Fetch repository commits"""
         url = f'{self.base_url}/repos/{owner}/{repo}/commits'
-        response = requests.get(url, headers=self.headers)
+        response = self._rest_get(url)
         if response.status_code != 200:
             return []
         return response.json()
@@ -219,14 +716,13 @@ class GitHubScraper:
     def _get_repo_contributors(self, owner, repo):
         """Fetch repository contributors"""
         url = f'{self.base_url}/repos/{owner}/{repo}/contributors'
-        response = requests.get(url, headers=self.headers)
+        response = self._rest_get(url)
         if response.status_code != 200:
             return []
         return response.json()
 
-    def _get_latest_commits(self, owner, repo, limit=5):
-        """Fetch latest commits for a repository"""
-        commits = self._get_repo_commits(owner, repo)
+    @staticmethod
+    def _format_latest_commits(commits, limit=5):
         latest = []
         for commit in commits[:limit]:
             latest.append({
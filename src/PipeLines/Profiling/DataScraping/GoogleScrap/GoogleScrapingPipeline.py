@@ -1,5 +1,6 @@
 from flask import Flask
 from typing import List, Optional, Dict
+from src.Helpers.CandidateContext import CandidateContext
 from src.Modules.Candidate.CandidateModels import Candidate, CandidatePipelineStatus
 from src.Modules.Candidate.CandidateService import CandidateService
 from src.Modules.PipeLineData.GoogleScrapData.GoogleScrapServices import GoogleScrapDataService
@@ -18,12 +19,20 @@ class GoogleScrapingConfig(PipelineConfig):
                  serperToken: str = "",
                  githubToken: str = "",
                  rapid_api_key: str = "",
-                 serperBaseUrl: str = "https://google.serper.dev/search"):
+                 serperBaseUrl: str = "https://google.serper.dev/search",
+                 search_cache_path: str = "./src/Static/Cache/Serper",
+                 search_cache_ttl_hours: float = 168,
+                 candidate_deadline_seconds: float = 300,
+                 pre_ranking: Optional[Dict] = None):
         super().__init__(name, batch_size, process_interval=process_interval)
         self.serperToken = serperToken
         self.githubToken = githubToken
         self.rapid_api_key = rapid_api_key
         self.serperBaseUrl = serperBaseUrl
+        self.search_cache_path = search_cache_path
+        self.search_cache_ttl_hours = search_cache_ttl_hours
+        self.candidate_deadline_seconds = candidate_deadline_seconds
+        self.pre_ranking = pre_ranking or {}
 
 
 class GoogleScrapingPipeline(BasePipeline):
@@ -33,7 +42,11 @@ class GoogleScrapingPipeline(BasePipeline):
         self.__scraper = ProfileScraper(config.githubToken,
                                         config.serperToken,
                                         config.serperBaseUrl,
-                                        config.rapid_api_key)
+                                        config.rapid_api_key,
+                                        config.search_cache_path,
+                                        config.search_cache_ttl_hours,
+                                        config.candidate_deadline_seconds,
+                                        config.pre_ranking)
         self.__candidate_service = CandidateService()
         self.__googleScrapDataService = GoogleScrapDataService()
 
@@ -44,7 +57,9 @@ class GoogleScrapingPipeline(BasePipeline):
                 .all())
 
     def process_item(self, candidate: Candidate) -> Optional[Dict]:
-        profile: Profile = self.__scraper.find_profiles(candidate)
+        # Candidate, resume and job are loaded once and shared by the scrapers and verifiers
+        context = CandidateContext.load(candidate)
+        profile: Profile = self.__scraper.find_profiles(candidate, context)
 
         if profile.githubHandle.github_username is None and profile.githubHandle.github_username is not None:
             raise CustomError(f"Failed to find user linkedin and github handles ", 400)
@@ -1,12 +1,21 @@
+import re
+import threading
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Optional, List, Set
+from typing import Optional, List, Set, Callable, Any, Dict
 from urllib.parse import urlparse
 
+from flask import current_app
+
+from src.Helpers.CandidateContext import CandidateContext
+from src.Helpers.DiskCache import DiskTTLCache
 from src.Helpers.HandleProfileVerification import HandleProfileVerification
+from src.Helpers.ProfilePreRanking import CandidateFacts, ProfileLead, rank_leads
+from src.Helpers.RetryPolicy import current_retry_budget, bind_retry_budget
+from src.Helpers.ScrapeStaging import get_scrape_staging
+from src.Modules.LLMUsage.LLMUsageService import current_usage_scope, llm_usage_scope
 from src.Modules.Candidate.CandidateModels import Candidate
-from src.Modules.PipeLineData.TextExtractionData.TextExtractionService import TextExtractionDataService
 from src.PipeLines.Profiling.DataScraping.GitHubScrap.GithubScraper import GitHubScraper
 from src.PipeLines.Profiling.DataScraping.LinkedInScrap.RapidLinkedInScrapper import RapidLinkedInAPIClient
 
@@ -49,15 +58,25 @@ GitHub: {self.githubHandle}
 class ProfileScraper:
     """Scraper class specifically optimized for finding GitHub and LinkedIn profiles"""
 
-    def __init__(self, githubToken, serperToken, serperBaseUrl, rapid_api_key):
+    def __init__(self, githubToken, serperToken, serperBaseUrl, rapid_api_key,
+                 search_cache_path="./src/Static/Cache/Serper", search_cache_ttl_hours=168,
+                 candidate_deadline_seconds=300, pre_ranking=None):
         self.api_key = serperToken
         self.serperBaseUrl = serperBaseUrl
         self.verifier = HandleProfileVerification(gitHubToken=githubToken,rapidApiKey=rapid_api_key)
         self.githubScraper = GitHubScraper(githubToken)
         self.linkedInScraper = RapidLinkedInAPIClient(rapid_api_key)
-        self.textExtractionDataService = TextExtractionDataService()
-        self.search_delay = 1
+        self.searchCache = DiskTTLCache(search_cache_path, search_cache_ttl_hours * 3600, name="serper_search")
+        # Verified scrape payloads, picked up by the LinkedIn and GitHub stages instead of scraping again
+        self.scrapeStaging = get_scrape_staging()
         self.max_results = 10
+        self.request_timeout = 30  # seconds
+        self.candidate_deadline_seconds = candidate_deadline_seconds
+
+        # Cheap local ranking of search results before the expensive scrape and LLM verification
+        pre_ranking = pre_ranking or {}
+        self.pre_rank_min_score = pre_ranking.get("min_score", 0.35)
+        self.max_verifications = pre_ranking.get("max_verifications", 3)
 
     def _generate_profile_queries(self, name: str) -> List[str]:
         """Generate search queries specifically for finding professional profiles"""
@@ -75,8 +94,20 @@ class ProfileScraper:
 
         return variations
 
+    @staticmethod
+    def _normalise_name(name: str) -> str:
+        """Case and whitespace insensitive form of a name, so equal names share cached search results"""
+        return re.sub(r'\s+', ' ', name).strip().lower()
+
     def _make_search_request(self, query: str, site: str) -> List[str]:
-        """Make a search request using Serper API with profile-specific queries"""
+        """Make a search request using Serper API with profile-specific queries, returns the profile URLs"""
+        return [result['link'] for result in self._search_profiles(query, site)]
+
+    def _search_profiles(self, query: str, site: str) -> List[Dict[str, str]]:
+        """
+        Search profiles using Serper API, returns the link, title and snippet of each profile result
+        All query variations go out as one batched request, results are cached on disk per (name, site)
+        """
         base_url = self.serperBaseUrl
 
         # Define profile-specific search patterns
@@ -91,56 +122,64 @@ class ProfileScraper:
             }
         }
 
-        all_urls = set()
-        site_config = profile_patterns.get(site, {})
-
-        # Generate search variations
-        search_variations = self._generate_profile_queries(query)
-
-        for variation in search_variations:
-            # Build a profile-specific search query
-            search_query = f"{variation} {site_config.get('prefix', '')}"
-
-            payload = {
-                "q": f"{search_query}",
-                "num": self.max_results
-            }
-            headers = {
-                'X-API-KEY': self.api_key,
-                'Content-Type': 'application/json'
-            }
-
-            try:
-                response = requests.post(base_url, headers=headers, json=payload)
-                response.raise_for_status()
-                data = response.json()
-
-                if 'organic' in data:
-                    for result in data['organic']:
-                        if 'link' in result:
-                            url = result['link']
-                            # Only add URLs that match our profile patterns
-                            if site in url.lower() and (
-                                    ('/in/' in url.lower() if site == 'linkedin.com/in' else True) or
-                                    (parsed_url := urlparse(url)).netloc.lower() == 'github.com'
-                            ):
-                                all_urls.add(url)
-
-                time.sleep(self.search_delay)
+        cache_key = f"results|{site}|{self._normalise_name(query)}"
+        cached_results = self.searchCache.get(cache_key)
+        if cached_results is not None:
+            print(f"Using cached search results for '{query}' on {site}")
+            return cached_results
 
-            except requests.exceptions.RequestException as e:
-                print(f"Search request failed for query '{search_query}': {e}")
-                continue
-
-        return list(all_urls)[:self.max_results]
+        all_results = {}  # by URL, keeps the search ranking
+        site_config = profile_patterns.get(site, {})
 
-    def _find_linkedin_profile(self, candidate: Candidate) -> LinkedInHandle:
-        """Find LinkedIn profile for a given name"""
-        full_name = candidate.first_name + " " + candidate.last_name
-        resume = self.textExtractionDataService.get_resume_by_candidate_id(candidate.id)
+        # Generate search variations, Serper accepts a list of queries and answers them in one response
+        search_queries = [
+            f"{variation} {site_config.get('prefix', '')}"
+            for variation in self._generate_profile_queries(query)
+        ]
+        payload = [{"q": search_query, "num": self.max_results} for search_query in search_queries]
+        headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
 
-        linkedInUrl = resume["personalInformation"]["linkedinUrl"]
-        linkedInHandle = resume["personalInformation"]["linkedinHandle"]
+        try:
+            response = requests.post(base_url, headers=headers, json=payload, timeout=self.request_timeout)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Search request failed for queries {search_queries}: {e}")
+            return []
+
+        for result_set in (data if isinstance(data, list) else [data]):
+            for result in result_set.get('organic', []):
+                if 'link' in result:
+                    url = result['link']
+                    # Only add URLs that match our profile patterns
+                    if site in url.lower() and (
+                            ('/in/' in url.lower() if site == 'linkedin.com/in' else True) or
+                            urlparse(url).netloc.lower() == 'github.com'
+                    ):
+                        all_results.setdefault(url, {
+                            'link': url,
+                            'title': result.get('title', ''),
+                            'snippet': result.get('snippet', '')
+                        })
+
+        results = list(all_results.values())[:self.max_results]
+        self.searchCache.put(cache_key, results)
+        return results
+
+    def _find_linkedin_profile(self, context: CandidateContext,
+                               deadline: Optional[threading.Event] = None) -> LinkedInHandle:
+        """
+        Find LinkedIn profile for a given name
+        Stops between requests once deadline is set, the caller has then discarded the result
+        """
+        deadline = deadline or threading.Event()
+        full_name = context.full_name
+
+        linkedInUrl = context.personal_information.get("linkedinUrl")
+        linkedInHandle = context.personal_information.get("linkedinHandle")
 
         if linkedInUrl and linkedInHandle:
             print("Found the linkedin url in the resume :", linkedInUrl)
@@ -152,49 +191,79 @@ class ProfileScraper:
             )
 
         # Get LinkedIn URLs
-        linkedin_urls = self._make_search_request(full_name, "linkedin.com/in")
-        if not linkedin_urls:
+        linkedin_results = self._search_profiles(full_name, "linkedin.com/in")
+        if not linkedin_results:
             print("No LinkedIn URLs found")
             return LinkedInHandle()
 
+        linkedin_urls = [result['link'] for result in linkedin_results]
         print(f"Found {len(linkedin_urls)} LinkedIn URLs")
-        time.sleep(self.search_delay)
 
-        # Extract and verify usernames
+        # Extract usernames and rank them on the search title and snippet
         usernames = self._extract_linkedin_usernames(linkedin_urls)
         print(f"Extracted {len(usernames)} unique LinkedIn usernames")
 
-        # Find first verified username
+        results_by_username = {}
+        for result in linkedin_results:
+            for username in self._extract_linkedin_usernames([result['link']]):
+                results_by_username.setdefault(username, result)
+
+        leads = []
         for username in usernames:
+            result = results_by_username.get(username, {})
+            leads.append(ProfileLead(
+                username=username,
+                url=result.get('link'),
+                # LinkedIn titles read "<Full Name> - <Headline> | LinkedIn"
+                name=result.get('title', '').split(' - ')[0].split(' | ')[0],
+                text=f"{result.get('title', '')} {result.get('snippet', '')}"
+            ))
+        facts = CandidateFacts.from_dtos(context.candidate, context.resume)
+        ranked_leads = rank_leads(facts, leads, self.pre_rank_min_score, self.max_verifications)
+
+        # Find first verified username
+        for lead in ranked_leads:
+            if deadline.is_set():
+                return LinkedInHandle()
+            username = lead.username
             print(f"Verifying LinkedIn username: {username}")
             linkedin_scrap = self.linkedInScraper.get_profile(username)
+            if deadline.is_set():
+                return LinkedInHandle()
             print(f"processing: {linkedin_scrap}")
             res = self.verifier.verify_profile(
                 scraped_data=linkedin_scrap,
-                candidate_id=candidate.id,
-                profile_type="LinkedIn"
+                candidate_id=context.candidate_id,
+                profile_type="LinkedIn",
+                context=context
             )
 
             if not res or len(res) < 0: return LinkedInHandle()
 
             if res["is_match"]:
-                matching_url = next((url for url in linkedin_urls if f'/in/{username}' in url.lower()), None)
+                if deadline.is_set():
+                    return LinkedInHandle()
+                self.scrapeStaging.stage("linkedin", context.candidate_id, username, linkedin_scrap)
                 return LinkedInHandle(
                     verified=True,
                     linkedin_username=username,
-                    linkedin_url=matching_url
+                    linkedin_url=lead.url
                 )
 
         print("No verified LinkedIn profiles found")
         return LinkedInHandle()
 
-    def _find_github_profile(self, candidate: Candidate) -> GithubHandle:
-        """Find GitHub profile for a given name"""
-        full_name = candidate.first_name + " " + candidate.last_name
-        resume = self.textExtractionDataService.get_resume_by_candidate_id(candidate.id)
+    def _find_github_profile(self, context: CandidateContext,
+                             deadline: Optional[threading.Event] = None) -> GithubHandle:
+        """
+        Find GitHub profile for a given name
+        Stops between requests once deadline is set, the caller has then discarded the result
+        """
+        deadline = deadline or threading.Event()
+        full_name = context.full_name
 
-        githubUrl = resume["personalInformation"]["githubUrl"]
-        githubHandle = resume["personalInformation"]["githubHandle"]
+        githubUrl = context.personal_information.get("githubUrl")
+        githubHandle = context.personal_information.get("githubHandle")
 
         if githubUrl and githubHandle:
             print("Found the GitHub url in the resume:", githubUrl)
@@ -212,35 +281,67 @@ class ProfileScraper:
             return GithubHandle()
 
         print(f"Found {len(github_urls)} GitHub URLs")
-        time.sleep(self.search_delay)
 
-        # Extract and verify usernames
+        # Extract usernames and rank them on their public GitHub profile, one light request each
         usernames = self._extract_github_usernames(github_urls)
         print(f"Extracted {len(usernames)} unique GitHub usernames")
 
-        # Find first verified username
+        leads = []
         for username in usernames:
+            if deadline.is_set():
+                return GithubHandle()
+            summary = self.githubScraper.get_user_summary(username) or {}
+            leads.append(ProfileLead(
+                username=username,
+                url=next((url for url in github_urls
+                          if urlparse(url).path.strip('/').split('/')[0].lower() == username), None),
+                name=summary.get('name') or username,
+                location=summary.get('location'),
+                company=summary.get('company'),
+                email=summary.get('email'),
+                text=summary.get('bio') or ''
+            ))
+        facts = CandidateFacts.from_dtos(context.candidate, context.resume)
+        ranked_leads = rank_leads(facts, leads, self.pre_rank_min_score, self.max_verifications)
+
+        # The candidate's own email on the profile is conclusive, no scrape or LLM verification needed
+        email_match = next((lead for lead in ranked_leads if lead.exact_email_match), None)
+        if email_match:
+            print(f"GitHub username {email_match.username} matches the candidate email")
+            return GithubHandle(
+                verified=True,
+                github_username=email_match.username,
+                github_url=email_match.url
+            )
+
+        # Find first verified username
+        for lead in ranked_leads:
+            if deadline.is_set():
+                return GithubHandle()
+            username = lead.username
             print(f"Verifying GitHub username: {username}")
 
             try:
-                print(f"Inside try verify GitHub username: {username}")
                 git_scrap = self.githubScraper.get_user_stats(username)
+                if deadline.is_set():
+                    return GithubHandle()
 
                 res = self.verifier.verify_profile(
                     scraped_data=git_scrap,
-                    candidate_id=candidate.id,
-                    profile_type="github")
+                    candidate_id=context.candidate_id,
+                    profile_type="github",
+                    context=context)
 
                 if not res or len(res) < 0: return GithubHandle()
-                print(res["is_match"], type(res["is_match"]))
                 if bool(res["is_match"]):
-                    matching_url = next((url for url in github_urls if f'/{username}' in url.lower()), None)
-                    print(f"Found {len(matching_url)} GitHub URLs")
-                    print(f"username: {username}, url : {matching_url}")
+                    print(f"username: {username}, url : {lead.url}")
+                    if deadline.is_set():
+                        return GithubHandle()
+                    self.scrapeStaging.stage("github", context.candidate_id, username, git_scrap)
                     return GithubHandle(
                         verified=True,
                         github_username=username,
-                        github_url=matching_url
+                        github_url=lead.url
                     )
 
             except requests.exceptions.RequestException as e:
@@ -258,7 +359,7 @@ class ProfileScraper:
                     # Extract username from LinkedIn profile URL
                     username = url.split('/in/')[-1].strip('/')
                     username = username.split('/')[0]  # Get first part of path
-                    username = username.split('?')[0]  # Remove query parameters
+                    username = username.split('?')[0].lower()  # Remove query parameters, slugs are case-insensitive
 
                     # Only add if it looks like a valid LinkedIn username
                     if username and len(username) >= 3 and not username.startswith(('company', 'school')):
@@ -289,20 +390,63 @@ class ProfileScraper:
                 print(f"Failed to extract GitHub username from {url}: {e}")
         return usernames
 
-    def find_profiles(self,candidate : Candidate) -> Profile:
-        """Main method to find profiles for a given name"""
-        name = candidate.first_name + " " + candidate.last_name
+    @staticmethod
+    def _in_worker_context(func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wraps func to run on a worker thread with the caller's app context, LLM usage scope and retry budget,
+        all of which are bound to the calling thread
+        """
+        app = current_app._get_current_object()
+        usage_scope = current_usage_scope()
+        retry_budget = current_retry_budget()
+
+        def run(*args, **kwargs):
+            bind_retry_budget(retry_budget)
+            with app.app_context(), llm_usage_scope(**usage_scope):
+                return func(*args, **kwargs)
+
+        return run
+
+    def find_profiles(self, candidate: Candidate, context: Optional[CandidateContext] = None) -> Profile:
+        """
+        Main method to find profiles for a given name
+        The candidate context is loaded here unless the calling stage already has one
+        GitHub and LinkedIn discovery are independent and run concurrently. A branch still running at the
+        candidate deadline is abandoned and reported as not found, so it cannot hold up the other result.
+        The abandoned branch is told to stop at its next request and does not stage what it scraped.
+        """
+        context = context or CandidateContext.load(candidate)
+        name = context.full_name
         print(f"\nStarting profile search for: {name}")
 
         # Create profile with name
         _profile = Profile(fullName=name)
 
-        # Then find GitHub profile
-        _profile.githubHandle = self._find_github_profile(candidate)
-
-        # Find LinkedIn profile first
-        _profile.linkedInHandle = self._find_linkedin_profile(candidate)
+        deadline = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="profile_discovery")
+        try:
+            github_future = executor.submit(self._in_worker_context(self._find_github_profile), context, deadline)
+            linkedin_future = executor.submit(self._in_worker_context(self._find_linkedin_profile), context,
+                                              deadline)
+            wait([github_future, linkedin_future], timeout=self.candidate_deadline_seconds)
+            deadline.set()
+
+            _profile.githubHandle = self.__branch_result(github_future, GithubHandle, "GitHub", name)
+            _profile.linkedInHandle = self.__branch_result(linkedin_future, LinkedInHandle, "LinkedIn", name)
+        finally:
+            # Do not wait for an abandoned branch, its result is discarded
+            deadline.set()
+            executor.shutdown(wait=False, cancel_futures=True)
 
         print(f"inside profile is : {_profile}")
         return _profile
 
+    def __branch_result(self, future, empty_handle, profile_type: str, name: str):
+        if not future.done():
+            print(f"{profile_type} discovery for {name} exceeded the {self.candidate_deadline_seconds}s deadline")
+            return empty_handle()
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"{profile_type} discovery failed for {name}: {e}")
+            return empty_handle()
@@ -8,6 +8,7 @@ from src.PipeLines.PipeLineManagement.PipeLineBase import PipelineConfig, BasePi
 from src.PipeLines.PipeLineManagement.PipeLineMonitor import PipelineMonitor
 from src.PipeLines.Profiling.DataScraping.LinkedInScrap.RapidLinkedInScrapper import RapidLinkedInAPIClient
 from src.Helpers.ErrorHandling import CustomError
+from src.Helpers.ScrapeStaging import get_scrape_staging
 
 
 class LinkedInScrapingConfig(PipelineConfig):
@@ -28,6 +29,7 @@ class LinkedInScrapingPipeline(BasePipeline):
         self.__googleScrapDataService = GoogleScrapDataService()
         self.__linkedInScrapDataService = LinkedInScrapDataService()
         self.__rapidLinkedInScraper = RapidLinkedInAPIClient(config.rapid_api_key)
+        self.__scrapeStaging = get_scrape_staging()
 
     def get_input_data(self) -> List[Candidate]:
         return (Candidate.query
@@ -42,12 +44,15 @@ class LinkedInScrapingPipeline(BasePipeline):
         if not username:
             raise CustomError(f"No LinkedIn URL found for candidate {candidate.id}", 400)
 
-        profile_data = self.__rapidLinkedInScraper.get_profile(username)
+        # Scraped while verifying the handle in the Google stage, only fetched again when missing or stale
+        profile_data = self.__scrapeStaging.get("linkedin", candidate.id, username)
+        if profile_data is None:
+            profile_data = self.__rapidLinkedInScraper.get_profile(username)
 
         if profile_data is None:
             raise CustomError(f"Failed to get LinkedIn profile ", 400)
 
-        return {'candidate_id': candidate.id, 'profile_data': profile_data}
+        return {'candidate_id': candidate.id, 'username': username, 'profile_data': profile_data}
 
     def update_output(self, results: List[Dict]) -> None:
         for result in results:
@@ -56,6 +61,7 @@ class LinkedInScrapingPipeline(BasePipeline):
                     result['candidate_id'],
                     result['profile_data']
                 )
+                self.__scrapeStaging.discard("linkedin", result['candidate_id'], result['username'])
                 self.__candidateService.set_pipeline_status_to_github_scrape(
                     result['candidate_id']
                 )
@@ -3,6 +3,7 @@ from typing import List, Optional, Dict
 from datetime import datetime
 import os
 
+from src.Helpers.CacheStats import cache_stats
 from src.Helpers.LLMService import LLMService
 from src.Modules.Candidate.CandidateModels import Candidate, CandidateStatus, CandidatePipelineStatus
 from src.Modules.Candidate.CandidateService import CandidateService
@@ -13,6 +14,9 @@ from src.PipeLines.PipeLineManagement.PipeLineMonitor import PipelineMonitor
 from src.config.DBModelsConfig import db
 from src.Helpers.ErrorHandling import CustomError
 
+# Share of resumes whose extraction was cloned from an earlier copy of the same file
+dedup_stats = cache_stats("resume_extraction_dedup")
+
 
 class TextExtractionPipelineConfig(PipelineConfig):
     def __init__(self,
@@ -55,7 +59,15 @@ class TextExtractionPipeline(BasePipeline):
         if not resume:
             raise CustomError(f"No resume found for candidate {candidate.email}", 404)
 
-        extracted_text = self.__llmService.parse_resume_with_vision(resume.file_path)
+        # The same file often arrives more than once, reuse the earlier extraction instead of parsing it again
+        content_hash = self.__document_service.ensure_content_hash(resume)
+        extracted_text = self.__textExtractionDataService.get_resume_by_document_hash(content_hash, candidate.id)
+        if extracted_text is not None:
+            dedup_stats.record_hit()
+            self.logger.info(f"Reusing extraction of identical document {content_hash[:12]} for {candidate.id}")
+        else:
+            dedup_stats.record_miss()
+            extracted_text = self.__llmService.parse_resume_with_vision(resume.file_path)
 
         return {
             'candidate_id': candidate.id,
@@ -72,7 +84,8 @@ class TextExtractionPipeline(BasePipeline):
             try:
                 self.__textExtractionDataService.create_resume(
                     result['extracted_text'],
-                    result['candidate_id']
+                    result['candidate_id'],
+                    result['document_id']
                 )
                 self.__candidate_service.set_pipeline_status_to_google_scrape(
                     result['candidate_id']
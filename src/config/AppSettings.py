@@ -84,6 +84,10 @@ def init_pipelines(app: Flask, config: dict):
         serperToken=config["profiler"]["google_api_key"],
         githubToken=config["profiler"]["github_token"],
         rapid_api_key=config["profiler"]["rapid_api_key"],
+        search_cache_path=config["profiler"].get("search_cache", {}).get("path", "./src/Static/Cache/Serper"),
+        search_cache_ttl_hours=config["profiler"].get("search_cache", {}).get("ttl_hours", 168),
+        candidate_deadline_seconds=config["profiler"].get("candidate_deadline_seconds", 300),
+        pre_ranking=config["profiler"].get("pre_ranking"),
     )
     google_pipeline = GoogleScrapingPipeline(app, google_scraping_config, monitor)
     manager.register_pipeline(google_pipeline)